@@ -0,0 +1,167 @@
+"""ASGI entry point: serves the Flask app from an event loop.
+
+    uvicorn asgi:application --host 0.0.0.0 --port 8000 --workers 2
+
+Requests run on a bounded pool of ASGI_THREADS worker threads, as they would
+under a threaded WSGI server. Most routes go through a standard WSGI-to-ASGI
+adapter (a2wsgi, or uvicorn's built-in one when a2wsgi is not installed).
+/speak/<word> is served natively, because a TTS cache miss there would
+otherwise hold a thread for the whole synthesis:
+
+* app.pending_synthesis() looks up, without side effects, the synthesis the
+  request needs; the event loop awaits it (asyncio.wrap_future) and only then
+  runs the view, once, with the finished future in the environ;
+* the audio file is read chunk by chunk on the pool and written to the client
+  from the event loop, so slow clients hold no thread.
+"""
+import asyncio
+import contextvars
+import io
+import os
+import sys
+
+from uvicorn.middleware.wsgi import WSGIMiddleware  # a2wsgi's adapter when it is installed
+
+from app import app, create_tables, pending_synthesis, tts_backend
+
+app.config['ASGI_THREADS'] = int(os.getenv('ASGI_THREADS', 8))
+
+# WSGI environ key read by app.audio_path()
+RESUME_KEY = 'linguamate.tts_future'
+SPEAK_PREFIX = '/speak/'
+
+
+def build_environ(scope):
+    """PEP 3333 environ for an ASGI HTTP scope without a request body"""
+    root_path = scope.get('root_path', '')
+    path = scope['path']
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': root_path.encode('utf-8').decode('latin-1'),
+        'PATH_INFO': path.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = scope['client'][0], str(scope['client'][1])
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        environ[name] = f'{environ[name]},{value}' if name in environ else value
+    return environ
+
+
+class Application:
+    """ASGI app: /speak/<word> natively, every other request through the WSGI adapter.
+
+    Both share the adapter's thread pool, so ASGI_THREADS bounds all Flask work.
+    """
+
+    def __init__(self, wsgi_app, threads=8, synthesis_timeout=10.0, on_startup=None):
+        self.wsgi_app = wsgi_app
+        self.synthesis_timeout = synthesis_timeout
+        self.on_startup = on_startup
+        self.adapter = WSGIMiddleware(wsgi_app, workers=threads)
+        self.executor = self.adapter.executor
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD') and self._is_speak(scope):
+            await self.speak(scope, send)
+        elif scope['type'] == 'http':
+            await self.adapter(scope, receive, send)
+        else:
+            raise NotImplementedError(f'Unsupported ASGI scope type {scope["type"]}')
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                if self.on_startup:
+                    await asyncio.get_running_loop().run_in_executor(self.executor, self.on_startup)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    def _is_speak(scope):
+        root_path = scope.get('root_path', '')
+        path = scope['path']
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        return path.startswith(SPEAK_PREFIX)
+
+    async def speak(self, scope, send):
+        loop = asyncio.get_running_loop()
+        # One contextvars context per request, so generators using stream_with_context can
+        # be resumed on whichever pool thread is free
+        context = contextvars.copy_context()
+        future = await loop.run_in_executor(self.executor, context.run, pending_synthesis, build_environ(scope))
+        environ = build_environ(scope)
+        if future is not None:
+            try:
+                # shield: the synthesis may be shared with other requests, so never cancel it
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.synthesis_timeout)
+            except Exception:
+                pass  # the view reports the failure or timeout
+            environ[RESUME_KEY] = future
+
+        status, headers, chunks = await loop.run_in_executor(self.executor, context.run, self._call_app, environ)
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await self._send_body(chunks, send, context)
+
+    def _call_app(self, environ):
+        """(status, headers, body iterable)"""
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                   for name, value in headers]
+
+        # Flask calls start_response before returning the body iterable
+        chunks = self.wsgi_app(environ, start_response)
+        return response['status'], response['headers'], chunks
+
+    async def _send_body(self, chunks, send, context):
+        loop = asyncio.get_running_loop()
+        try:
+            if isinstance(chunks, (list, tuple)):
+                for chunk in chunks:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            else:
+                iterator = iter(chunks)
+                while True:
+                    chunk = await loop.run_in_executor(self.executor, context.run, next, iterator, None)
+                    if chunk is None:
+                        break
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        finally:
+            await loop.run_in_executor(self.executor, context.run, self._close, chunks)
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+    @staticmethod
+    def _close(chunks):
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+application = Application(app, threads=app.config['ASGI_THREADS'],
+                          synthesis_timeout=tts_backend.timeout, on_startup=create_tables)
@@ -0,0 +1,146 @@
+import hashlib
+import os
+import tempfile
+import threading
+import unicodedata
+
+
+def normalize_text(text):
+    """Normalize text so equivalent spellings share one cache entry"""
+    return unicodedata.normalize('NFC', ' '.join(text.split())).lower()
+
+
+class AudioCache:
+    """Content-addressed on-disk cache for synthesized speech.
+
+    Entries are keyed by (lang_code, normalized text, slow flag) and stored as
+    ``<dir>/<ab>/<sha256>.mp3``. Writes go to a temp file in the same directory
+    and are moved into place with ``os.replace`` so concurrent workers never see
+    a partial file. The total size is bounded; the least recently used entries
+    (by mtime, which is bumped on every hit) are evicted first.
+    """
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024, suffix='.mp3'):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, lang_code, text, slow=False):
+        raw = f'{lang_code}\0{normalize_text(text)}\0{int(bool(slow))}'
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def path_for_key(self, key):
+        return os.path.join(self.directory, key[:2], key + self.suffix)
+
+    def path_for(self, lang_code, text, slow=False):
+        return self.path_for_key(self.key(lang_code, text, slow))
+
+    def contains(self, lang_code, text, slow=False):
+        """Check for an entry without touching counters or recency"""
+        return os.path.exists(self.path_for(lang_code, text, slow))
+
+    def get(self, lang_code, text, slow=False):
+        """Return the cached file path, or None on a miss"""
+        path = self.path_for(lang_code, text, slow)
+        try:
+            os.utime(path, None)  # bump recency for LRU eviction
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def record_miss(self):
+        """Count a miss detected without ``get`` (e.g. with ``contains``)"""
+        with self._lock:
+            self.misses += 1
+
+    def put(self, lang_code, text, data, slow=False):
+        """Atomically store audio bytes and return the final path"""
+        path = self.path_for(lang_code, text, slow)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                fp.write(data)
+            with self._lock:
+                # Overwriting an entry replaces its bytes rather than adding to them
+                try:
+                    replaced = os.path.getsize(path)
+                except FileNotFoundError:
+                    replaced = 0
+                os.replace(tmp_path, path)
+                if self._size is None:
+                    self._size = self._scan_size()
+                else:
+                    self._size += len(data) - replaced
+                over_budget = self._size > self.max_bytes
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        if over_budget:
+            self.evict()
+        return path
+
+    def get_or_create(self, lang_code, text, synthesize, slow=False):
+        """Return a cached path, calling ``synthesize(text, lang_code, slow)`` on a miss"""
+        path = self.get(lang_code, text, slow)
+        if path:
+            return path
+        return self.put(lang_code, text, synthesize(text, lang_code, slow), slow)
+
+    def _entries(self):
+        for root, _dirs, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(self.suffix):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, st.st_size, st.st_mtime
+
+    def _scan_size(self):
+        return sum(size for _path, size, _mtime in self._entries())
+
+    def evict(self, target_ratio=0.9):
+        """Remove least recently used entries until under ``target_ratio`` of the budget"""
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _path, size, _mtime in entries)
+        target = self.max_bytes * target_ratio
+        removed = 0
+        for path, size, _mtime in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        with self._lock:
+            self._size = total
+            self.evictions += removed
+        return removed
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'size_bytes': self._size if self._size is not None else self._scan_size(),
+                'max_bytes': self.max_bytes,
+            }
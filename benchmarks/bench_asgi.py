@@ -0,0 +1,234 @@
+"""Benchmark concurrent throughput of the sync (WSGI) and async (ASGI) serving modes.
+
+Usage: python benchmarks/bench_asgi.py [--threads 8] [--clients 32] [--speakers 16]
+                                       [--tts-latency 0.5] [--seconds 10] [--modes sync,asgi]
+
+Both modes serve the app from a server subprocess with the same number of
+worker threads (--threads):
+  sync  werkzeug WSGI server with a fixed thread pool, like a threaded
+        gunicorn worker; a TTS cache miss holds its thread until synthesis ends
+  asgi  uvicorn running asgi:application; a miss is awaited on the event loop
+
+--speakers of the --clients request /speak/<word> for words that are never
+cached (each a --tts-latency second stub synthesis, standing in for gTTS);
+the rest send /api/search-word and /practice-result. The report shows
+throughput and latency per route, so you can see the JSON endpoints starve
+behind slow syntheses in sync mode. Requires uvicorn for the asgi mode.
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = 'bench'
+WORDS = 500
+
+
+def serve(mode, port, threads, tts_latency):
+    """Server subprocess entry point"""
+    sys.path.insert(0, ROOT)
+    import app as app_module
+    app_module.app.config['WTF_CSRF_ENABLED'] = False
+    app_module.tts_backend.latency = tts_latency
+    if mode == 'asgi':
+        import uvicorn
+        import asgi
+        uvicorn.run(asgi.application, host='127.0.0.1', port=port, log_level='warning')
+        return
+
+    import logging
+    from concurrent.futures import ThreadPoolExecutor
+    from werkzeug.serving import BaseWSGIServer
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)  # no per-request access log
+
+    class PooledWSGIServer(BaseWSGIServer):
+        """Fixed pool of worker threads, so a blocked request takes a worker away from everyone else"""
+        multithread = True
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.pool = ThreadPoolExecutor(max_workers=threads)
+
+        def process_request(self, request, client_address):
+            self.pool.submit(self._process, request, client_address)
+
+        def _process(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    server = PooledWSGIServer('127.0.0.1', port, app_module.app)
+    server.request_queue_size = 128
+    server.serve_forever()
+
+
+def seed(env, users):
+    subprocess.run([sys.executable, '-c', f'''
+import sys
+sys.path.insert(0, {ROOT!r})
+from werkzeug.security import generate_password_hash
+import app as app_module
+from models import db, User, Vocabulary
+with app_module.app.app_context():
+    db.create_all()
+    password_hash = generate_password_hash({PASSWORD!r})
+    for user_id in range(1, {users} + 1):
+        db.session.add(User(id=user_id, username=f'bench{{user_id}}', email=f'bench{{user_id}}@example.com',
+                            password_hash=password_hash, target_language='Spanish'))
+        db.session.bulk_insert_mappings(Vocabulary, [
+            {{'user_id': user_id, 'word': f'word{{i}}', 'translation': f'translation{{i}}', 'language': 'Spanish'}}
+            for i in range({WORDS})])
+    db.session.commit()
+'''], env=env, check=True)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(port, timeout=30):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit(f'Server on port {port} did not start')
+
+
+class HttpClient:
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def request(self, method, path, body=None, form=None):
+        data, headers = None, {}
+        if body is not None:
+            data, headers = json.dumps(body).encode(), {'Content-Type': 'application/json'}
+        elif form is not None:
+            data = urllib.parse.urlencode(form).encode()
+        request = urllib.request.Request(self.base_url + urllib.parse.quote(path), data=data, headers=headers,
+                                         method=method)
+        try:
+            with self.opener.open(request, timeout=60) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+        except OSError:
+            return 599
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def run_mode(mode, args, env):
+    port = free_port()
+    server = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', mode, '--port', str(port),
+                               '--threads', str(args.threads), '--tts-latency', str(args.tts_latency)], env=env)
+    try:
+        wait_for(port)
+        base_url = f'http://127.0.0.1:{port}'
+        latencies = defaultdict(list)
+        failures = defaultdict(int)
+        lock = threading.Lock()
+
+        def worker(number):
+            client = HttpClient(base_url)
+            user_id = number % args.users + 1
+            client.request('POST', '/login', form={'email': f'bench{user_id}@example.com', 'password': PASSWORD})
+            rng = random.Random(number)
+            local = defaultdict(list)
+            local_failures = defaultdict(int)
+            sequence = 0
+            while time.perf_counter() < deadline:
+                if number < args.speakers:
+                    sequence += 1
+                    name, method, path, body = 'GET /speak/<word>', 'GET', f'/speak/{mode}{number}x{sequence}', None
+                elif rng.random() < 0.5:
+                    name, method, path, body = ('POST /api/search-word', 'POST', '/api/search-word',
+                                                {'word': f'word{rng.randrange(WORDS)}'})
+                else:
+                    name, method, path, body = ('POST /practice-result', 'POST', '/practice-result',
+                                                {'word': f'word{rng.randrange(WORDS)}', 'correct': rng.random() < 0.7})
+                started = time.perf_counter()
+                status = client.request(method, path, body)
+                local[name].append((time.perf_counter() - started) * 1000)
+                local_failures[name] += status >= 400
+            with lock:
+                for name, samples in local.items():
+                    latencies[name].extend(samples)
+                for name, count in local_failures.items():
+                    failures[name] += count
+
+        deadline = time.perf_counter() + args.seconds
+        threads = [threading.Thread(target=worker, args=(number,)) for number in range(args.clients)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f'\n{mode}: {args.threads} worker threads, {args.clients} clients ({args.speakers} speaking)')
+    print(f'{"route":<24} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"failed":>7}')
+    for name, samples in sorted(latencies.items()):
+        print(f'{name:<24} {len(samples) / elapsed:>8.1f} {percentile(samples, 0.5):>8.1f} '
+              f'{percentile(samples, 0.95):>8.1f} {percentile(samples, 0.99):>8.1f} {failures[name]:>7}')
+    total = sum(len(samples) for samples in latencies.values())
+    print(f'{"total":<24} {total / elapsed:>8.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8, help='Worker threads per server (both modes)')
+    parser.add_argument('--clients', type=int, default=32, help='Concurrent HTTP clients')
+    parser.add_argument('--speakers', type=int, default=16, help='Clients requesting uncached pronunciations')
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--tts-latency', type=float, default=0.5, help='Seconds per stub synthesis')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--modes', default='sync,asgi')
+    parser.add_argument('--serve', choices=['sync', 'asgi'], help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.threads, args.tts_latency)
+        return
+
+    directory = tempfile.mkdtemp()
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{os.path.join(directory, "bench.db")}', TTS_BACKEND='stub',
+               AUDIO_MODE='browser', AUDIO_CACHE_DIR=os.path.join(directory, 'audio'),
+               ASGI_THREADS=str(args.threads), TTS_MAX_CONCURRENCY=str(max(args.speakers, 1)),
+               TTS_TIMEOUT=str(max(10.0, args.tts_latency * 4)), SQLITE_BUSY_TIMEOUT='10000')
+    seed(env, args.users)
+    for mode in args.modes.split(','):
+        run_mode(mode, args, env)
+
+
+if __name__ == '__main__':
+    main()
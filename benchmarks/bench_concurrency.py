@@ -0,0 +1,138 @@
+"""Benchmark mixed read/write route traffic under concurrency: default SQLite settings vs. WAL + pragmas.
+
+Usage: python benchmarks/bench_concurrency.py [--threads 8] [--seconds 10] [--write-ratio 0.3] [--words 2000]
+
+Each configuration runs in its own process against a fresh database file and
+reports successful requests/second, latency percentiles and failed requests
+(typically "database is locked").
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONFIGURATIONS = {
+    # SQLite's own defaults: rollback journal, full fsync, no busy wait
+    'default': {'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL', 'SQLITE_BUSY_TIMEOUT': '0',
+                'SQLITE_MMAP_SIZE': '0', 'SQLITE_CACHE_SIZE': '-2000'},
+    # The app's defaults
+    'tuned': {},
+}
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def seed(app_module, users, words):
+    from werkzeug.security import generate_password_hash
+    from models import db, User, Vocabulary
+    from stats import rebuild_user_stats
+
+    password_hash = generate_password_hash('bench')
+    with app_module.app.app_context():
+        db.create_all()
+        for user_id in range(1, users + 1):
+            db.session.add(User(id=user_id, username=f'bench{user_id}', email=f'bench{user_id}@example.com',
+                                password_hash=password_hash, target_language='Spanish'))
+            db.session.bulk_insert_mappings(Vocabulary, [
+                {'user_id': user_id, 'word': f'word{i}', 'translation': f'translation{i}', 'language': 'Spanish',
+                 'proficiency': random.randint(0, 5)}
+                for i in range(words)
+            ])
+            rebuild_user_stats(user_id)
+        db.session.commit()
+
+
+def worker(app_module, user_id, deadline, write_ratio, latencies, failures, lock):
+    client = app_module.app.test_client()
+    client.post('/login', data={'email': f'bench{user_id}@example.com', 'password': 'bench'})
+    rng = random.Random(user_id)
+    counter = 0
+    local_latencies = []
+    local_failures = 0
+    while time.perf_counter() < deadline:
+        counter += 1
+        started = time.perf_counter()
+        if rng.random() < write_ratio:
+            if rng.random() < 0.5:
+                response = client.post('/vocabulary', data={'word': f'new{user_id}-{counter}', 'translation': 'x',
+                                                            'proficiency': 0})
+            else:
+                response = client.post('/practice-results', json={
+                    'results': [{'word': f'word{rng.randrange(100)}', 'correct': rng.random() < 0.7}
+                                for _ in range(5)], 'duration': 30})
+        elif rng.random() < 0.25:
+            response = client.post('/api/search-word', json={'word': f'word{rng.randrange(100)}'})
+        else:
+            response = client.get(rng.choice(['/vocabulary', '/api/vocabulary', '/statistics']))
+        local_latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            local_failures += 1
+    with lock:
+        latencies.extend(local_latencies)
+        failures.append(local_failures)
+
+
+def run_child(args):
+    random.seed(0)
+    sys.path.insert(0, ROOT)
+    import app as app_module
+    app_module.app.config['WTF_CSRF_ENABLED'] = False
+    seed(app_module, args.threads, args.words)
+
+    latencies, failures, lock = [], [], threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+    threads = [threading.Thread(target=worker, args=(app_module, user_id, deadline, args.write_ratio,
+                                                     latencies, failures, lock))
+               for user_id in range(1, args.threads + 1)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    print(json.dumps({'requests': len(latencies), 'failures': sum(failures),
+                      'rps': (len(latencies) - sum(failures)) / elapsed,
+                      'p50': percentile(latencies, 0.5), 'p95': percentile(latencies, 0.95),
+                      'p99': percentile(latencies, 0.99)}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--write-ratio', type=float, default=0.3)
+    parser.add_argument('--words', type=int, default=2000, help='Vocabulary words per user')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    print(f'{args.threads} threads, {args.seconds:g}s, {args.write_ratio:.0%} writes')
+    print(f'{"config":<8} {"ok req/s":>9} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"failed":>7}')
+    for name, overrides in CONFIGURATIONS.items():
+        directory = tempfile.mkdtemp()
+        env = dict(os.environ, DATABASE_URL=f'sqlite:///{os.path.join(directory, "bench.db")}',
+                   TTS_BACKEND='stub', AUDIO_CACHE_DIR=os.path.join(directory, 'audio'), **overrides)
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child',
+                                 '--threads', str(args.threads), '--seconds', str(args.seconds),
+                                 '--write-ratio', str(args.write_ratio), '--words', str(args.words)],
+                                env=env, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f'{name:<8} {result["rps"]:>9.1f} {result["p50"]:>8.2f} {result["p95"]:>8.2f} '
+              f'{result["p99"]:>8.2f} {result["failures"]:>7}')
+
+
+if __name__ == '__main__':
+    main()
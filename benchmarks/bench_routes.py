@@ -0,0 +1,310 @@
+"""Benchmark every main route against a seeded synthetic database, optionally checked against a baseline.
+
+Usage: python benchmarks/bench_routes.py [--users 20] [--words 2000] [--sessions 500]
+                                         [--iterations 50] [--threads 8] [--seconds 10]
+                                         [--baseline benchmarks/baseline.json] [--save-baseline FILE]
+
+Two phases run against the same database:
+  client  each route is called sequentially through the Flask test client;
+          reports latency percentiles and SQL statements per request
+  http    a threaded HTTP server is driven by concurrent clients issuing a
+          mix of all routes; reports throughput and latency under load
+
+TTS uses the stub backend and audio is streamed to the (simulated) browser,
+so no network or speakers are needed. With --baseline the run fails (exit 1)
+if any route issues more SQL statements than recorded, goes missing, or
+returns an error status. These checks are deterministic. Latency and
+throughput that regress by more than --tolerance are reported as warnings
+only, since the recorded milliseconds depend on the machine.
+"""
+import argparse
+import http.cookiejar
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORKDIR = tempfile.mkdtemp()
+os.environ.update({
+    'DATABASE_URL': f'sqlite:///{os.path.join(WORKDIR, "bench.db")}',
+    'TTS_BACKEND': 'stub',
+    'AUDIO_MODE': 'browser',
+    'AUDIO_CACHE_DIR': os.path.join(WORKDIR, 'audio'),
+})
+
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+from werkzeug.serving import make_server
+
+import app as app_module
+from models import db, User, Vocabulary, PracticeSession
+from stats import rebuild_user_stats
+
+PASSWORD = 'bench'
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 3) if ordered else 0.0
+
+
+def seed(users, words, sessions):
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    password_hash = generate_password_hash(PASSWORD)
+    with app_module.app.app_context():
+        db.create_all()
+        for user_id in range(1, users + 1):
+            db.session.add(User(id=user_id, username=f'bench{user_id}', email=f'bench{user_id}@example.com',
+                                password_hash=password_hash, target_language='Spanish'))
+            db.session.bulk_insert_mappings(Vocabulary, [
+                {'user_id': user_id, 'word': f'word{i}', 'translation': f'translation{i}', 'language': 'Spanish',
+                 'proficiency': rng.randint(0, 5), 'created_at': now - timedelta(days=rng.randint(0, 365)),
+                 'due_at': now - timedelta(days=rng.randint(-30, 30))}
+                for i in range(words)
+            ])
+            db.session.bulk_insert_mappings(PracticeSession, [
+                {'user_id': user_id, 'words_practiced': 5, 'correct_pronunciations': rng.randint(0, 5),
+                 'session_duration': 60, 'session_date': now - timedelta(hours=i * 6)}
+                for i in range(sessions)
+            ])
+            rebuild_user_stats(user_id)
+        db.session.commit()
+
+
+def route_requests(rng, words):
+    """(route name, method, path, json body) for one call of every benchmarked route"""
+    word = f'word{rng.randrange(min(words, 100))}'
+    return [
+        ('GET /vocabulary', 'GET', '/vocabulary', None),
+        ('GET /daily-words', 'GET', '/daily-words', None),
+        ('GET /pronunciation', 'GET', '/pronunciation', None),
+        ('GET /statistics', 'GET', '/statistics', None),
+        ('GET /api/activity', 'GET', '/api/activity', None),
+        ('POST /api/search-word', 'POST', '/api/search-word', {'word': word[:-1] + 'x'}),
+        ('POST /practice-result', 'POST', '/practice-result', {'word': word, 'correct': rng.random() < 0.7}),
+        ('GET /speak/<word>', 'GET', f'/speak/{word}?lang=es', None),
+    ]
+
+
+CONDITIONAL_ROUTES = ['/vocabulary', '/daily-words', '/statistics', '/api/vocabulary', '/api/activity']
+
+
+def run_client_phase(args):
+    """Sequential requests per route through the test client, counting SQL statements.
+
+    Pages with ETags are also measured as a browser revalidating them
+    (If-None-Match), which should cost one lookup and a 304.
+    """
+    client = app_module.app.test_client()
+    client.post('/login', data={'email': 'bench1@example.com', 'password': PASSWORD})
+    queries = []
+    listener = lambda *_args: queries.append(1)
+
+    # Warm-up: generate today's suggestions, build search indexes, fill the audio cache
+    for _name, method, path, body in route_requests(random.Random(0), args.words):
+        client.open(path, method=method, json=body)
+    for number in range(min(args.words, 100)):
+        client.get(f'/speak/word{number}?lang=es')
+
+    with app_module.app.app_context():
+        engine = db.engine
+
+    def measure(send, expected_status=None):
+        """(name, result row) over --iterations calls of ``send() -> (name, response)``"""
+        latencies = []
+        statements = 0
+        event.listen(engine, 'before_cursor_execute', listener)
+        try:
+            for _ in range(args.iterations):
+                queries.clear()
+                started = time.perf_counter()
+                name, response = send()
+                latencies.append((time.perf_counter() - started) * 1000)
+                statements = max(statements, len(queries))
+                if response.status_code >= 400 or expected_status not in (None, response.status_code):
+                    raise SystemExit(f'{name} returned {response.status_code}')
+        finally:
+            event.remove(engine, 'before_cursor_execute', listener)
+        return name, {'queries': statements, 'p50_ms': percentile(latencies, 0.5),
+                      'p95_ms': percentile(latencies, 0.95), 'p99_ms': percentile(latencies, 0.99)}
+
+    rng = random.Random(1)
+    results = {}
+    for position in range(len(route_requests(rng, args.words))):
+        def send():
+            name, method, path, body = route_requests(rng, args.words)[position]
+            return name, client.open(path, method=method, json=body)
+        name, row = measure(send)
+        results[name] = row
+
+    for path in CONDITIONAL_ROUTES:
+        etag = client.get(path).headers['ETag']
+        name, row = measure(lambda: (f'GET {path} (304)', client.get(path, headers={'If-None-Match': etag})), 304)
+        results[name] = row
+    return results
+
+
+class HttpClient:
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def request(self, method, path, body=None, form=None):
+        data, headers = None, {}
+        if body is not None:
+            data, headers = json.dumps(body).encode(), {'Content-Type': 'application/json'}
+        elif form is not None:
+            data = urllib.parse.urlencode(form).encode()
+        request = urllib.request.Request(self.base_url + urllib.parse.quote(path), data=data, headers=headers,
+                                         method=method)
+        try:
+            with self.opener.open(request, timeout=30) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+def run_http_phase(args):
+    """Concurrent clients against a threaded HTTP server, each logged in as its own user"""
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)  # no per-request access log
+    server = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    latencies = defaultdict(list)
+    failures = []
+    lock = threading.Lock()
+
+    def worker(number):
+        client = HttpClient(base_url)
+        user_id = number % args.users + 1
+        client.request('POST', '/login', form={'email': f'bench{user_id}@example.com', 'password': PASSWORD})
+        rng = random.Random(number)
+        local = defaultdict(list)
+        local_failures = 0
+        while time.perf_counter() < deadline:
+            name, method, path, body = rng.choice(route_requests(rng, args.words))
+            started = time.perf_counter()
+            status = client.request(method, path, body)
+            local[name].append((time.perf_counter() - started) * 1000)
+            local_failures += status >= 400
+        with lock:
+            for name, samples in local.items():
+                latencies[name].extend(samples)
+            failures.append(local_failures)
+
+    deadline = time.perf_counter() + args.seconds
+    threads = [threading.Thread(target=worker, args=(number,)) for number in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    total = sum(len(samples) for samples in latencies.values())
+    routes = {name: {'requests': len(samples), 'p50_ms': percentile(samples, 0.5),
+                     'p95_ms': percentile(samples, 0.95), 'p99_ms': percentile(samples, 0.99)}
+              for name, samples in sorted(latencies.items())}
+    return {'throughput_rps': round(total / elapsed, 1), 'failures': sum(failures), 'routes': routes}
+
+
+def compare(results, baseline, tolerance):
+    """(regressions, warnings) against the baseline.
+
+    Regressions are deterministic: more SQL statements per request, missing
+    routes, failed requests. Latency and throughput vary between machines, so
+    they only produce warnings.
+    """
+    if baseline.get('config') != results['config']:
+        return [f'baseline was recorded with {baseline.get("config")}, this run used {results["config"]}'], []
+    problems, warnings = [], []
+    for name, expected in baseline.get('client', {}).items():
+        actual = results['client'].get(name)
+        if actual is None:
+            problems.append(f'{name}: missing from this run')
+            continue
+        if actual['queries'] > expected['queries']:
+            problems.append(f'{name}: {actual["queries"]} SQL statements per request (baseline {expected["queries"]})')
+        if actual['p95_ms'] > expected['p95_ms'] * (1 + tolerance):
+            warnings.append(f'{name}: p95 {actual["p95_ms"]:.2f} ms (baseline {expected["p95_ms"]:.2f} ms)')
+    expected_rps = baseline.get('http', {}).get('throughput_rps')
+    if expected_rps and 'http' in results and results['http']['throughput_rps'] < expected_rps * (1 - tolerance):
+        warnings.append(f'throughput {results["http"]["throughput_rps"]:.1f} req/s (baseline {expected_rps:.1f})')
+    if 'http' in results and results['http']['failures']:
+        problems.append(f'{results["http"]["failures"]} failed request(s) under load')
+    return problems, warnings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--words', type=int, default=2000, help='Vocabulary words per user')
+    parser.add_argument('--sessions', type=int, default=500, help='Practice sessions per user')
+    parser.add_argument('--iterations', type=int, default=50, help='Sequential calls per route (client phase)')
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent HTTP clients (http phase)')
+    parser.add_argument('--seconds', type=float, default=10, help='Duration of the http phase (0 skips it)')
+    parser.add_argument('--baseline', help='JSON file to check the results against')
+    parser.add_argument('--save-baseline', help='Write the results to this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='Latency/throughput regression (fraction of the baseline) reported as a warning')
+    args = parser.parse_args()
+
+    app_module.app.config['WTF_CSRF_ENABLED'] = False
+    started = time.perf_counter()
+    seed(args.users, args.words, args.sessions)
+    print(f'Seeded {args.users} users x {args.words} words x {args.sessions} sessions '
+          f'in {time.perf_counter() - started:.1f}s')
+
+    results = {'config': {'users': args.users, 'words': args.words, 'sessions': args.sessions},
+               'client': run_client_phase(args)}
+    print(f'\n{"route (test client)":<30} {"queries":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}')
+    for name, row in results['client'].items():
+        print(f'{name:<30} {row["queries"]:>8} {row["p50_ms"]:>8.2f} {row["p95_ms"]:>8.2f} {row["p99_ms"]:>8.2f}')
+
+    if args.seconds > 0:
+        results['http'] = run_http_phase(args)
+        print(f'\n{"route (HTTP, " + str(args.threads) + " clients)":<24} {"requests":>8} {"p50 ms":>8} '
+              f'{"p95 ms":>8} {"p99 ms":>8}')
+        for name, row in results['http']['routes'].items():
+            print(f'{name:<24} {row["requests"]:>8} {row["p50_ms"]:>8.2f} {row["p95_ms"]:>8.2f} {row["p99_ms"]:>8.2f}')
+        print(f'throughput: {results["http"]["throughput_rps"]:.1f} req/s, {results["http"]["failures"]} failed')
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as fp:
+            json.dump(results, fp, indent=2, sort_keys=True)
+            fp.write('\n')
+        print(f'\nBaseline written to {args.save_baseline}')
+
+    if args.baseline:
+        with open(args.baseline) as fp:
+            problems, warnings = compare(results, json.load(fp), args.tolerance)
+        if warnings:
+            print('\nSlower than the baseline (advisory; timings depend on the machine):')
+            for warning in warnings:
+                print(f'  {warning}')
+        if problems:
+            print('\nRegressions against the baseline:')
+            for problem in problems:
+                print(f'  {problem}')
+            raise SystemExit(1)
+        print('\nNo regressions against the baseline')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark prefix and fuzzy word search over a synthetic catalog.
+
+Usage: python benchmarks/bench_search.py [--words 100000] [--queries 500] [--catalog]
+
+--catalog searches the index stored in a compiled catalog file (what
+build-catalog writes) instead of building one in memory.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import MappedLanguageIndex, write_catalog_file
+from search import SearchIndex
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyzáéíñóú'
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def timed(fn, queries):
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--words', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--catalog', action='store_true', help='search a compiled catalog file')
+    args = parser.parse_args()
+
+    random.seed(0)
+    words = set()
+    while len(words) < args.words:
+        words.add(''.join(random.choice(LETTERS) for _ in range(random.randint(3, 12))))
+    words = list(words)
+
+    started = time.perf_counter()
+    if args.catalog:
+        path = os.path.join(tempfile.mkdtemp(), 'bench.wcat')
+        write_catalog_file(path, ((word, word) for word in words))
+        print(f'catalog written in {time.perf_counter() - started:.2f}s ({os.path.getsize(path) // 1024} KiB)')
+        started = time.perf_counter()
+        index = MappedLanguageIndex(path).search_index()
+        print(f'{len(index)} words mapped in {time.perf_counter() - started:.4f}s')
+    else:
+        index = SearchIndex((word, None) for word in words)
+        print(f'{len(index)} words indexed in {time.perf_counter() - started:.2f}s')
+
+    sample = random.sample(words, args.queries)
+    typos = []
+    for word in sample:
+        position = random.randrange(len(word))
+        typos.append(word[:position] + random.choice(LETTERS) + word[position + 1:])
+
+    print(f'{"query type":<10} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}')
+    for name, fn, queries in [('prefix', index.prefix, [word[:3] for word in sample]),
+                              ('fuzzy', index.fuzzy, typos),
+                              ('search', index.search, typos)]:
+        samples = timed(fn, queries)
+        print(f'{name:<10} {percentile(samples, 0.5):>8.2f} {percentile(samples, 0.95):>8.2f} '
+              f'{percentile(samples, 0.99):>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
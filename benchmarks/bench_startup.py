@@ -0,0 +1,79 @@
+"""Benchmark `import app` startup time for each audio mode.
+
+Usage: python benchmarks/bench_startup.py [--runs 10] [--root DIR] [--importtime]
+
+Each run imports the app in a fresh interpreter, as a new worker process or
+CLI command would. --root points at another checkout (e.g. an older commit
+from `git worktree add`) to compare before/after; --importtime lists the
+slowest top-level imports.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = ['browser', 'server', 'off']
+
+
+def run_import(root, env, extra_args=()):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, *extra_args, '-c', 'import app'], cwd=root, env=env,
+                            capture_output=True, text=True)
+    elapsed = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise SystemExit(f'import app failed:\n{result.stderr}')
+    return elapsed, result.stderr
+
+
+def slowest_imports(importtime_output, count=10):
+    """Top-level imports of ``app`` by cumulative time from ``python -X importtime``"""
+    rows = []
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = len(name) - len(name.lstrip())
+        if depth <= 3:
+            rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--root', default=ROOT, help='Checkout to measure (default: this one)')
+    parser.add_argument('--importtime', action='store_true', help='Show the slowest imports')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    base_env = dict(os.environ, DATABASE_URL=f'sqlite:///{os.path.join(directory, "bench.db")}',
+                    AUDIO_CACHE_DIR=os.path.join(directory, 'audio'), TTS_BACKEND='stub')
+    # Python's own startup, to separate from the app's import cost
+    interpreter = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        interpreter.append((time.perf_counter() - started) * 1000)
+    interpreter = statistics.median(interpreter)
+
+    print(f'{args.root}: {args.runs} runs per mode (bare interpreter {interpreter:.0f} ms)')
+    print(f'{"AUDIO_MODE":<10} {"median ms":>10} {"min ms":>8} {"max ms":>8}')
+    for mode in MODES:
+        env = dict(base_env, AUDIO_MODE=mode)
+        samples = [run_import(args.root, env)[0] for _ in range(args.runs)]
+        print(f'{mode:<10} {statistics.median(samples):>10.0f} {min(samples):>8.0f} {max(samples):>8.0f}')
+
+    if args.importtime:
+        _elapsed, output = run_import(args.root, dict(base_env, AUDIO_MODE='server'), ['-X', 'importtime'])
+        print(f'\n{"slowest imports (AUDIO_MODE=server)":<40} {"ms":>8}')
+        for cumulative_us, name in slowest_imports(output):
+            print(f'{name:<40} {cumulative_us / 1000:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""Benchmark the /statistics queries: legacy per-bucket counts vs. aggregates vs. the UserStats summary.
+
+Usage: python benchmarks/bench_statistics.py [--words 10000] [--sessions 2000] [--repeat 20]
+
+Also compares building the /api/activity heatmap from the raw practice
+sessions with reading it from the DailyActivity rollup.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import event
+
+from models import db, User, Vocabulary, PracticeSession
+from stats import (ACTIVITY_COLUMNS, ACTIVITY_DAYS, activity_calendar, aggregate_user_statistics,
+                   compute_user_statistics, rebuild_user_stats, streak_runs)
+
+
+def legacy_statistics(user_id):
+    """The original statistics() route body, one query per number"""
+    total_words = Vocabulary.query.filter_by(user_id=user_id).count()
+    proficiency_distribution = {
+        'Beginner (0-2)': Vocabulary.query.filter_by(user_id=user_id).filter(
+            Vocabulary.proficiency <= 2).count(),
+        'Intermediate (2-4)': Vocabulary.query.filter_by(user_id=user_id).filter(
+            Vocabulary.proficiency > 2, Vocabulary.proficiency <= 4).count(),
+        'Advanced (4-5)': Vocabulary.query.filter_by(user_id=user_id).filter(Vocabulary.proficiency > 4).count()
+    }
+    last_week = datetime.utcnow() - timedelta(days=7)
+    recent_words = Vocabulary.query.filter_by(user_id=user_id).filter(Vocabulary.created_at >= last_week).count()
+    total_practice_sessions = PracticeSession.query.filter_by(user_id=user_id).count()
+    total_words_practiced = db.session.query(db.func.sum(PracticeSession.words_practiced)).filter_by(
+        user_id=user_id).scalar() or 0
+    last_practice = PracticeSession.query.filter_by(user_id=user_id).order_by(
+        PracticeSession.session_date.desc()).first()
+    return {
+        'total_words': total_words,
+        'proficiency_distribution': proficiency_distribution,
+        'recent_words': recent_words,
+        'total_practice_sessions': total_practice_sessions,
+        'total_words_practiced': total_words_practiced,
+        'last_practice': last_practice.session_date if last_practice else None,
+    }
+
+
+def raw_activity_calendar(user_id):
+    """The heatmap aggregated from every practice session in the last year"""
+    today = datetime.utcnow().date()
+    start = today - timedelta(days=ACTIVITY_DAYS - 1)
+    day = db.func.date(PracticeSession.session_date)
+    rows = db.session.query(
+        day, db.func.count(PracticeSession.id), db.func.sum(PracticeSession.words_practiced),
+        db.func.sum(PracticeSession.correct_pronunciations), db.func.sum(PracticeSession.session_duration),
+    ).filter(PracticeSession.user_id == user_id, PracticeSession.session_date >= start).group_by(day).order_by(day)
+    days = [dict(zip(ACTIVITY_COLUMNS, row[1:]), date=row[0]) for row in rows]
+    longest, _latest = streak_runs([datetime.fromisoformat(entry['date']).date() for entry in days])
+    return {'active_days': len(days), 'longest_streak': longest, 'days': days}
+
+
+def seed(user_id, words, sessions):
+    now = datetime.utcnow()
+    db.session.add(User(id=user_id, username=f'bench{user_id}', email=f'bench{user_id}@example.com',
+                        password_hash='x'))
+    db.session.bulk_insert_mappings(Vocabulary, [
+        {'user_id': user_id, 'word': f'word{i}', 'translation': f'translation{i}', 'language': 'Spanish',
+         'proficiency': random.randint(0, 5), 'created_at': now - timedelta(days=random.randint(0, 365))}
+        for i in range(words)
+    ])
+    db.session.bulk_insert_mappings(PracticeSession, [
+        {'user_id': user_id, 'words_practiced': 1, 'correct_pronunciations': random.randint(0, 1),
+         'session_duration': 10, 'session_date': now - timedelta(hours=i * 4)}
+        for i in range(sessions)
+    ])
+    db.session.commit()
+
+
+def measure(fn, user_id, repeat):
+    queries = []
+    listener = lambda *args: queries.append(1)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            result = fn(user_id)
+            db.session.expire_all()
+        elapsed = (time.perf_counter() - started) / repeat
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    return result, len(queries) // repeat, elapsed * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--words', type=int, default=10000)
+    parser.add_argument('--sessions', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=5, help='Other users sharing the tables')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(0)
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        for user_id in range(1, args.users + 2):
+            seed(user_id, args.words, args.sessions)
+            rebuild_user_stats(user_id)
+        db.session.commit()
+
+        print(f'{args.words} words, {args.sessions} sessions per user, {args.users + 1} users')
+        print(f'{"implementation":<12} {"queries":>8} {"ms/request":>11}')
+        results = []
+        for name, fn in [('legacy', legacy_statistics), ('aggregated', aggregate_user_statistics),
+                         ('summary', compute_user_statistics)]:
+            result, queries, ms = measure(fn, 1, args.repeat)
+            results.append(result)
+            print(f'{name:<12} {queries:>8} {ms:>11.2f}')
+
+        legacy, aggregated, summary = results
+        assert legacy['recent_words'] == aggregated['recent_words'] == summary['recent_words']
+        assert legacy['proficiency_distribution'] == summary['proficiency_distribution']
+        assert legacy['total_practice_sessions'] == aggregated['total_sessions'] == summary['total_practice_sessions']
+
+        print(f'\n{"activity":<12} {"queries":>8} {"ms/request":>11}')
+        results = []
+        for name, fn in [('sessions', raw_activity_calendar), ('rollup', activity_calendar)]:
+            result, queries, ms = measure(fn, 1, args.repeat)
+            results.append(result)
+            print(f'{name:<12} {queries:>8} {ms:>11.2f}')
+        raw, rollup = results
+        assert raw['active_days'] == rollup['active_days'] and raw['days'] == rollup['days']
+
+
+if __name__ == '__main__':
+    main()
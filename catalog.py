@@ -0,0 +1,413 @@
+import csv
+import json
+import mmap
+import os
+import random
+import struct
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import NamedTuple
+
+from search import SearchIndex, SearchResult, grams, normalize
+
+# Compiled catalog file layout (all integers little-endian):
+#   header       MAGIC, u16 format version, u32 entry count
+#   search       (version 2) u32 key count, u32 key table offset, u32 gram count, u32 gram table offset
+#   word index   count x u32 record offsets, sorted by UTF-8 word bytes
+#   translation  count x u32 positions in the word index, sorted by lowercased translation
+#   records      u16 word length, word bytes, u16 translation length, translation bytes
+# Version 2 appends the search index, so workers share it through the page cache too:
+#   key table    key count x (u32 key string offset, u32 word index position), sorted by normalized key
+#   gram table   gram count x (u32 gram string offset, u32 postings offset, u32 postings count),
+#                sorted by UTF-8 gram bytes
+#   postings     u32 key table positions of the keys containing each gram
+#   strings      u16 length + UTF-8 bytes for every key and gram
+# The keys are search.normalize() output, so changing it needs a new FORMAT_VERSION.
+MAGIC = b'LMWC'
+FORMAT_VERSION = 2
+READABLE_VERSIONS = (1, 2)
+CATALOG_SUFFIX = '.wcat'
+_HEADER = struct.Struct('<4sHI')
+_SEARCH_HEADER = struct.Struct('<IIII')
+_KEY_ENTRY = struct.Struct('<II')
+_GRAM_ENTRY = struct.Struct('<III')
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+
+
+class WordEntry(NamedTuple):
+    """A catalog word; tuple-backed so large catalogs stay compact"""
+    word: str
+    translation: str
+
+
+class LanguageIndex:
+    """In-memory word list for one language with hash indexes by word and translation"""
+
+    __slots__ = ('_entries', '_by_word', '_by_translation')
+
+    def __init__(self, entries):
+        self._entries = tuple(entries)
+        self._by_word = {entry.word: entry for entry in self._entries}
+        self._by_translation = {}
+        for entry in self._entries:
+            self._by_translation.setdefault(entry.translation.lower(), []).append(entry)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, position):
+        return self._entries[position]
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def lookup(self, word):
+        return self._by_word.get(word)
+
+    def lookup_translation(self, translation):
+        return self._by_translation.get(translation.lower(), [])
+
+
+class _SortedView:
+    """Sequence of sort keys for bisect over a mapped index"""
+
+    __slots__ = ('_length', '_key')
+
+    def __init__(self, length, key):
+        self._length = length
+        self._key = key
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, position):
+        return self._key(position)
+
+
+class MappedLanguageIndex:
+    """Read-only view of a compiled catalog file through ``mmap``.
+
+    Nothing is parsed up front: lookups binary-search the sorted offset tables
+    and decode only the records they touch. Because the file is mapped
+    read-only, every worker process shares the same pages from the OS page
+    cache instead of holding its own copy of the word list (or, for version 2
+    files, of its search index).
+    """
+
+    __slots__ = ('path', '_file', '_map', '_count', '_word_index', '_translation_index', '_by_word', '_by_translation',
+                 '_search')
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._count = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version not in READABLE_VERSIONS:
+            raise ValueError(f'{path} is not a version {FORMAT_VERSION} word catalog')
+        self._word_index = _HEADER.size
+        self._search = None
+        if version >= 2:
+            self._search = MappedSearchIndex(self, *_SEARCH_HEADER.unpack_from(self._map, _HEADER.size))
+            self._word_index += _SEARCH_HEADER.size
+        self._translation_index = self._word_index + self._count * _U32.size
+        self._by_word = _SortedView(self._count, lambda i: self._read_word(self._record_offset(i)))
+        self._by_translation = _SortedView(
+            self._count, lambda i: self._read_translation_key(self._translation_position(i)))
+
+    def _record_offset(self, position):
+        return _U32.unpack_from(self._map, self._word_index + position * _U32.size)[0]
+
+    def _translation_position(self, position):
+        return _U32.unpack_from(self._map, self._translation_index + position * _U32.size)[0]
+
+    def _read_field(self, offset):
+        (length,) = _U16.unpack_from(self._map, offset)
+        start = offset + _U16.size
+        return self._map[start:start + length], start + length
+
+    def _read_word(self, offset):
+        return self._read_field(offset)[0]
+
+    def _read_record(self, offset):
+        word, offset = self._read_field(offset)
+        translation, _offset = self._read_field(offset)
+        return WordEntry(word.decode('utf-8'), translation.decode('utf-8'))
+
+    def _read_translation_key(self, position):
+        entry = self[position]
+        return entry.translation.lower()
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += self._count
+        if not 0 <= position < self._count:
+            raise IndexError(position)
+        return self._read_record(self._record_offset(position))
+
+    def __iter__(self):
+        return (self[position] for position in range(self._count))
+
+    def lookup(self, word):
+        key = word.encode('utf-8')
+        position = bisect_left(self._by_word, key)
+        if position < self._count and self._by_word[position] == key:
+            return self[position]
+        return None
+
+    def lookup_translation(self, translation):
+        key = translation.lower()
+        position = bisect_left(self._by_translation, key)
+        matches = []
+        while position < self._count and self._by_translation[position] == key:
+            matches.append(self[self._translation_position(position)])
+            position += 1
+        return matches
+
+    def search_index(self):
+        """The SearchIndex stored in the file, or None for version 1 files"""
+        return self._search
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class MappedSearchIndex(SearchIndex):
+    """SearchIndex over the search section of a version 2 catalog file; nothing is built in memory.
+
+    Positions are indexes into the file's key table, which is sorted by
+    normalized key, so prefix search walks it directly and fuzzy search reads
+    one postings array per query trigram.
+    """
+
+    def __init__(self, catalog, key_count, key_table, gram_count, gram_table):
+        self._catalog = catalog
+        self._map = catalog._map
+        self._key_count = key_count
+        self._key_table = key_table
+        self._gram_count = gram_count
+        self._gram_table = gram_table
+        self._sorted_keys = _SortedView(key_count, self._key)
+        self._grams = _SortedView(gram_count, self._gram)
+
+    def __len__(self):
+        return self._key_count
+
+    def _key(self, position):
+        offset, _record = _KEY_ENTRY.unpack_from(self._map, self._key_table + position * _KEY_ENTRY.size)
+        return self._catalog._read_field(offset)[0].decode('utf-8')
+
+    def _gram(self, position):
+        offset = _U32.unpack_from(self._map, self._gram_table + position * _GRAM_ENTRY.size)[0]
+        return self._catalog._read_field(offset)[0]
+
+    def _sorted_entry(self, cursor):
+        return self._key(cursor), cursor
+
+    def _postings_for(self, gram):
+        key = gram.encode('utf-8')
+        position = bisect_left(self._grams, key)
+        if position == self._gram_count or self._grams[position] != key:
+            return ()
+        _offset, start, count = _GRAM_ENTRY.unpack_from(self._map, self._gram_table + position * _GRAM_ENTRY.size)
+        return struct.unpack_from(f'<{count}I', self._map, start)
+
+    def _result(self, position, match, distance):
+        _offset, record = _KEY_ENTRY.unpack_from(self._map, self._key_table + position * _KEY_ENTRY.size)
+        entry = self._catalog[record]
+        return SearchResult(entry.word, entry.translation, match, distance)
+
+
+def write_catalog_file(path, entries):
+    """Compile (word, translation) pairs into the mmap-friendly catalog format.
+
+    Duplicate words keep their first translation. The search index (sorted
+    normalized keys and trigram postings, see search.SearchIndex) is stored
+    after the records. The file is written to a temporary name and moved into
+    place so running workers never map a partial file.
+    """
+    unique = {}
+    for word, translation in entries:
+        word, translation = word.strip(), translation.strip()
+        if word and word not in unique:
+            unique[word] = translation
+    records = sorted(unique.items(), key=lambda item: item[0].encode('utf-8'))
+    count = len(records)
+
+    offsets = []
+    body = bytearray()
+    base = _HEADER.size + _SEARCH_HEADER.size + 2 * count * _U32.size
+    for word, translation in records:
+        offsets.append(base + len(body))
+        for field in (word.encode('utf-8'), translation.encode('utf-8')):
+            if len(field) > 0xFFFF:
+                raise ValueError(f'Catalog field too long: {field[:40]!r}...')
+            body += _U16.pack(len(field)) + field
+    by_translation = sorted(range(count), key=lambda position: records[position][1].lower())
+
+    keys = sorted((normalize(word), position) for position, (word, _translation) in enumerate(records))
+    keys = [(key, position) for key, position in keys if key]
+    postings = defaultdict(list)
+    for key_position, (key, _position) in enumerate(keys):
+        for gram in grams(key):
+            postings[gram.encode('utf-8')].append(key_position)
+    gram_list = sorted(postings.items())
+
+    key_table = base + len(body)
+    gram_table = key_table + len(keys) * _KEY_ENTRY.size
+    postings_start = gram_table + len(gram_list) * _GRAM_ENTRY.size
+    strings_start = postings_start + sum(len(positions) for _gram, positions in gram_list) * _U32.size
+    strings = bytearray()
+
+    def add_string(data):
+        offset = strings_start + len(strings)
+        strings.extend(_U16.pack(len(data)) + data)
+        return offset
+
+    key_entries = b''.join(_KEY_ENTRY.pack(add_string(key.encode('utf-8')), position) for key, position in keys)
+    gram_entries = bytearray()
+    postings_data = bytearray()
+    for gram, positions in gram_list:
+        gram_entries += _GRAM_ENTRY.pack(add_string(gram), postings_start + len(postings_data), len(positions))
+        postings_data += struct.pack(f'<{len(positions)}I', *positions)
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as fp:
+        fp.write(_HEADER.pack(MAGIC, FORMAT_VERSION, count))
+        fp.write(_SEARCH_HEADER.pack(len(keys), key_table, len(gram_list), gram_table))
+        fp.write(b''.join(_U32.pack(offset) for offset in offsets))
+        fp.write(b''.join(_U32.pack(position) for position in by_translation))
+        fp.write(body)
+        fp.write(key_entries)
+        fp.write(gram_entries)
+        fp.write(postings_data)
+        fp.write(strings)
+    os.replace(tmp_path, path)
+    return count
+
+
+def read_word_source(path, language=None):
+    """Read a CSV or JSON word list into ``{language: [(word, translation), ...]}``.
+
+    CSV files need ``word`` and ``translation`` columns and either a
+    ``language`` column or the ``language`` argument. JSON files are either
+    ``{language: [{"word", "translation"}, ...]}`` (the WORD_DATABASE shape) or
+    a flat list of word objects together with the ``language`` argument.
+    """
+    words = {}
+
+    def add(word_language, word, translation):
+        if not word_language:
+            raise ValueError(f'{path}: no language given for "{word}"')
+        words.setdefault(word_language, []).append((word, translation))
+
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as fp:
+            for row in csv.DictReader(fp):
+                add(row.get('language') or language, row['word'], row['translation'])
+    else:
+        with open(path, encoding='utf-8') as fp:
+            data = json.load(fp)
+        if isinstance(data, dict):
+            for word_language, items in data.items():
+                for item in items:
+                    add(word_language, item['word'], item['translation'])
+        else:
+            for item in data:
+                add(item.get('language') or language, item['word'], item['translation'])
+    return words
+
+
+class WordCatalog:
+    """Suggestion word lists with per-language indexes, loaded on first use.
+
+    Languages come from the built-in ``{language: [{'word', 'translation'}]}``
+    dict and, when ``directory`` is given, from compiled ``<Language>.wcat``
+    files in it (which take precedence). Lookups by word or translation are
+    index hits, and suggestion sampling excludes known words with set
+    membership instead of scanning lists.
+    """
+
+    __slots__ = ('_sources', '_indexes', '_lock')
+
+    def __init__(self, database=None, directory=None):
+        self._sources = dict(database or {})
+        self._indexes = {}
+        self._lock = threading.Lock()
+        if directory and os.path.isdir(directory):
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(CATALOG_SUFFIX):
+                    self._sources[name[:-len(CATALOG_SUFFIX)]] = os.path.join(directory, name)
+
+    def _index(self, language):
+        index = self._indexes.get(language)
+        if index is None and language in self._sources:
+            with self._lock:
+                index = self._indexes.get(language)
+                if index is None:
+                    source = self._sources[language]
+                    if isinstance(source, str):
+                        index = MappedLanguageIndex(source)
+                    else:
+                        index = LanguageIndex(WordEntry(w['word'], w['translation']) for w in source)
+                    self._indexes[language] = index
+        return index
+
+    def languages(self):
+        return list(self._sources)
+
+    def loaded_languages(self):
+        return list(self._indexes)
+
+    def words(self, language):
+        """All entries for a language (empty if the language is unknown)"""
+        index = self._index(language)
+        return index if index is not None else ()
+
+    def __contains__(self, language):
+        return language in self._sources
+
+    def lookup(self, language, word):
+        index = self._index(language)
+        return index.lookup(word) if index is not None else None
+
+    def search_index(self, language):
+        """The search index stored in the language's compiled file; None for built-in lists and version 1 files"""
+        index = self._index(language)
+        return index.search_index() if isinstance(index, MappedLanguageIndex) else None
+
+    def lookup_translation(self, language, translation):
+        index = self._index(language)
+        return index.lookup_translation(translation) if index is not None else []
+
+    def sample(self, language, count, exclude=frozenset(), rng=random):
+        """Pick up to ``count`` distinct random entries whose word is not in ``exclude``.
+
+        When most of the catalog is unknown to the user this is rejection
+        sampling (a handful of set lookups); only when the user knows a large
+        share of it do we fall back to filtering the whole list. If fewer than
+        ``count`` unknown words remain, known words are allowed again.
+        """
+        entries = self.words(language)
+        if not entries:
+            return []
+        count = min(count, len(entries))
+
+        if len(exclude) * 2 < len(entries):
+            chosen = {}
+            for _attempt in range(count * 20):
+                entry = entries[rng.randrange(len(entries))]
+                if entry.word not in exclude:
+                    chosen[entry.word] = entry
+                    if len(chosen) == count:
+                        return list(chosen.values())
+
+        available = [entry for entry in entries if entry.word not in exclude]
+        if len(available) < count:
+            available = list(entries)
+        return rng.sample(available, count)
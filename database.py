@@ -0,0 +1,61 @@
+from sqlalchemy import event
+
+DEFAULT_DATABASE_URL = 'sqlite:///language_learner.db'
+
+
+def database_url(url=None):
+    """Normalize DATABASE_URL; Heroku-style ``postgres://`` URLs are not accepted by SQLAlchemy"""
+    url = url or DEFAULT_DATABASE_URL
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def engine_options(url, pool_size=5, max_overflow=10, pool_timeout=30, pool_recycle=1800):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database"""
+    if url.startswith('sqlite') and (url in ('sqlite://', 'sqlite:///') or ':memory:' in url):
+        # In-memory databases live in a single connection; SQLAlchemy picks the pool
+        return {}
+    options = {'pool_size': pool_size, 'max_overflow': max_overflow, 'pool_timeout': pool_timeout}
+    if url.startswith('sqlite'):
+        # Requests run on several threads; each connection is still used by one thread at a time
+        options['connect_args'] = {'check_same_thread': False}
+    else:
+        # Server databases drop idle connections; check them before use and recycle periodically
+        options['pool_pre_ping'] = True
+        options['pool_recycle'] = pool_recycle
+    return options
+
+
+def sqlite_pragmas(journal_mode='WAL', synchronous='NORMAL', busy_timeout=5000, mmap_size=268435456,
+                   cache_size=-20000):
+    """PRAGMA statements run on every new SQLite connection.
+
+    WAL lets readers proceed while one writer commits, and ``synchronous=NORMAL``
+    is durable against application crashes in WAL mode (only an OS crash can lose
+    the last commits). ``busy_timeout`` (ms) makes a blocked writer wait instead
+    of failing with "database is locked". ``cache_size`` is in pages, or KiB
+    when negative.
+    """
+    return [
+        f'PRAGMA journal_mode={journal_mode}',
+        f'PRAGMA synchronous={synchronous}',
+        f'PRAGMA busy_timeout={int(busy_timeout)}',
+        f'PRAGMA mmap_size={int(mmap_size)}',
+        f'PRAGMA cache_size={int(cache_size)}',
+    ]
+
+
+def configure_engine(engine, pragmas):
+    """Apply ``pragmas`` to each connection the engine opens (SQLite only)"""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
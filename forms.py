@@ -1,8 +1,11 @@
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileField, FileRequired
 from wtforms import StringField, PasswordField, SubmitField, SelectField, IntegerField
 from wtforms.validators import DataRequired, Email, EqualTo, Length, ValidationError
 from models import User
 
+TARGET_LANGUAGES = ['Spanish', 'French', 'German', 'Italian', 'Japanese', 'Korean']
+
 
 class RegistrationForm(FlaskForm):
     username = StringField('Username', validators=[DataRequired(), Length(min=2, max=20)])
@@ -12,11 +15,7 @@ class RegistrationForm(FlaskForm):
         ('French', 'French'), ('German', 'German'),
         ('Chinese', 'Chinese'), ('Japanese', 'Japanese')
     ])
-    target_language = SelectField('Target Language', choices=[
-        ('Spanish', 'Spanish'), ('French', 'French'),
-        ('German', 'German'), ('Italian', 'Italian'),
-        ('Japanese', 'Japanese'), ('Korean', 'Korean')
-    ])
+    target_language = SelectField('Target Language', choices=[(language, language) for language in TARGET_LANGUAGES])
     password = PasswordField('Password', validators=[DataRequired()])
     confirm_password = PasswordField('Confirm Password',
                                      validators=[DataRequired(), EqualTo('password')])
@@ -48,4 +47,18 @@ class VocabularyForm(FlaskForm):
 
     def validate_proficiency(self, proficiency):
         if proficiency.data < 0 or proficiency.data > 5:
-            raise ValidationError('Proficiency must be between 0 and 5.')
\ No newline at end of file
+            raise ValidationError('Proficiency must be between 0 and 5.')
+
+
+class ImportVocabularyForm(FlaskForm):
+    file = FileField('Word list', validators=[FileRequired()])
+    format = SelectField('Format', choices=[
+        ('auto', 'Detect from file name'), ('csv', 'CSV (word, translation, ...)'),
+        ('jsonl', 'JSON Lines'), ('anki', 'Anki text export (tab-separated)')
+    ])
+    submit = SubmitField('Import')
+
+
+class LanguageForm(FlaskForm):
+    language = SelectField('Language', choices=[(language, language) for language in TARGET_LANGUAGES])
+    submit = SubmitField('Study')
@@ -0,0 +1,162 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import wraps
+
+from flask import Response, make_response, request, session
+from flask_login import current_user
+
+from models import db, today as utc_today, User, UserStats
+from profiles import remember_active_language
+
+
+def asset_version(*directories):
+    """Fingerprint of the newest file under ``directories``, so a deploy that changes templates changes every ETag"""
+    newest = 0
+    for directory in directories:
+        for root, _dirs, files in os.walk(directory):
+            for name in files:
+                newest = max(newest, os.stat(os.path.join(root, name)).st_mtime_ns)
+    return format(newest, 'x')
+
+
+def user_data_version(user_id):
+    """(data_version, data_updated_at, target_language) for a user: one primary-key lookup"""
+    row = db.session.query(UserStats.data_version, UserStats.data_updated_at, User.target_language).select_from(
+        User).outerjoin(UserStats, UserStats.user_id == User.id).filter(User.id == user_id).first()
+    if row is None:
+        return 0, None, None
+    return row.data_version or 0, row.data_updated_at, row.target_language
+
+
+class FragmentCache:
+    """LRU cache of rendered response bodies keyed by (user, URL, ETag).
+
+    Because the ETag changes with the user's data version, stale entries are
+    never served; they simply stop being requested and age out.
+    """
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body, mimetype):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (body, mimetype)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
+class HttpCache:
+    """Conditional GET support for per-user pages and JSON endpoints.
+
+    ``page()`` decorates a view so its response carries an ETag derived from
+    the user's data version (bumped by every write in stats.py), today's date,
+    the target language and the full URL, plus a matching Last-Modified. A
+    request whose If-None-Match / If-Modified-Since still matches gets a 304
+    after one primary-key lookup, without running the view. Views declared
+    with ``fragment=True`` also keep their rendered body in a server-side
+    cache, so a client without the page cached skips queries and rendering.
+
+    Pages with a CSRF token (``csrf=True``) put the current ``csrf_window``
+    into the ETag, so a revalidated page never carries a token older than
+    that window. Responses rendered with pending flash messages are never
+    cached or given validators.
+
+    The lookup also reads the target language. If it differs from the cached
+    profile's (switched in another worker), the request uses the fresh value
+    and ``on_stale_language(user_id)`` lets the profile cache drop its entry.
+    """
+
+    def __init__(self, salt='', fragment_cache_size=512, csrf_window=1800, on_stale_language=None):
+        self.salt = salt
+        self.csrf_window = csrf_window
+        self.fragments = FragmentCache(fragment_cache_size)
+        self.on_stale_language = on_stale_language
+
+    def _validators(self, csrf):
+        version, updated_at, language = user_data_version(current_user.id)
+        if language is not None and language != current_user.target_language:
+            remember_active_language(current_user.id, language)
+            if self.on_stale_language:
+                self.on_stale_language(current_user.id)
+        today = utc_today()  # the day suggestions and rollups use, see models.today
+        parts = [self.salt, current_user.id, version, today, current_user.username, language, request.full_path]
+        modified = [updated_at or datetime.min, datetime.combine(today, datetime.min.time())]
+        if csrf and self.csrf_window:
+            window = int(time.time() // self.csrf_window)
+            parts.append(window)
+            modified.append(datetime.utcfromtimestamp(window * self.csrf_window))
+        etag = hashlib.sha1('|'.join(map(str, parts)).encode()).hexdigest()[:20]
+        return etag, max(modified).replace(microsecond=0)
+
+    @staticmethod
+    def _not_modified(etag, last_modified):
+        if request.if_none_match:
+            return request.if_none_match.contains(etag)
+        since = request.if_modified_since
+        return since is not None and since.replace(tzinfo=None) >= last_modified
+
+    @staticmethod
+    def _add_headers(response, etag, last_modified):
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        # Private per-user data: browsers may keep it but must revalidate every time
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response.vary.add('Cookie')
+        return response
+
+    def page(self, fragment=False, csrf=False):
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if request.method != 'GET' or '_flashes' in session:
+                    return view(*args, **kwargs)
+
+                etag, last_modified = self._validators(csrf)
+                if self._not_modified(etag, last_modified):
+                    return self._add_headers(Response(status=304), etag, last_modified)
+
+                key = (current_user.id, request.full_path, etag)
+                cached = self.fragments.get(key) if fragment else None
+                if cached is not None:
+                    body, mimetype = cached
+                    return self._add_headers(Response(body, mimetype=mimetype), etag, last_modified)
+
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or '_flashes' in session:
+                    return response
+                if fragment and not response.is_streamed:
+                    self.fragments.put(key, response.get_data(), response.mimetype)
+                return self._add_headers(response, etag, last_modified)
+            return wrapper
+        return decorator
+
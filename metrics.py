@@ -0,0 +1,215 @@
+import threading
+import time
+from collections import Counter
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+# Latency buckets in seconds, from a cache hit to a slow TTS round-trip
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250)
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class CounterMetric:
+    """Monotonic counter keyed by label values"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            yield self.name, tuple(zip(self.label_names, label_values)), value
+
+
+class HistogramMetric:
+    """Cumulative-bucket histogram keyed by label values"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            series = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+        for label_values, (counts, total, count) in sorted(series.items()):
+            labels = tuple(zip(self.label_names, label_values))
+            for bound, bucket_count in zip(self.buckets, counts):
+                yield f'{self.name}_bucket', labels + (('le', _format_value(float(bound))),), bucket_count
+            yield f'{self.name}_bucket', labels + (('le', '+Inf'),), count
+            yield f'{self.name}_sum', labels, total
+            yield f'{self.name}_count', labels, count
+
+
+class CallbackMetric:
+    """Counter or gauge whose value is read from another component at scrape time"""
+
+    def __init__(self, name, help_text, kind, read):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self._read = read
+
+    def samples(self):
+        yield self.name, (), self._read()
+
+
+class MetricsRegistry:
+    """Collects metrics and renders them in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, label_names=()):
+        return self.register(CounterMetric(name, help_text, label_names))
+
+    def histogram(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        return self.register(HistogramMetric(name, help_text, label_names, buckets))
+
+    def callback(self, name, help_text, read, kind='gauge'):
+        return self.register(CallbackMetric(name, help_text, kind, read))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+class RequestMetrics:
+    """Per-request latency and SQL instrumentation for a Flask app.
+
+    Every request records its duration, status and the number and total time
+    of the SQL statements it ran, labelled by route rule (``/vocabulary/delete/<int:word_id>``,
+    not the raw URL, so label cardinality stays bounded). Requests slower than
+    ``slow_request_ms`` are logged with their slowest statements and any
+    statement repeated ``repeated_query_threshold`` times, which is how N+1
+    loops show up.
+    """
+
+    def __init__(self, registry, slow_request_ms=0, repeated_query_threshold=5):
+        self.registry = registry
+        self.slow_request_ms = slow_request_ms
+        self.repeated_query_threshold = repeated_query_threshold
+        self.requests = registry.counter('http_requests_total', 'HTTP requests handled',
+                                         ('method', 'route', 'status'))
+        self.latency = registry.histogram('http_request_duration_seconds', 'Time spent handling a request',
+                                          ('method', 'route'))
+        self.sql_queries = registry.histogram('http_request_sql_queries', 'SQL statements executed per request',
+                                              ('route',), QUERY_COUNT_BUCKETS)
+        self.sql_time = registry.histogram('http_request_sql_seconds', 'Time spent in SQL per request', ('route',))
+
+    def init_app(self, app, engine):
+        self.logger = app.logger
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context.metrics_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and 'metrics_queries' in g:
+            g.metrics_queries.append((statement, time.perf_counter() - context.metrics_started))
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_queries = []
+
+    def _route(self):
+        return request.url_rule.rule if request.url_rule else '<unmatched>'
+
+    def _record(self, status):
+        if 'metrics_started' not in g:
+            return
+        elapsed = time.perf_counter() - g.pop('metrics_started')
+        queries = g.pop('metrics_queries', [])
+        route = self._route()
+        sql_seconds = sum(seconds for _statement, seconds in queries)
+
+        self.requests.inc(request.method, route, str(status))
+        self.latency.observe(elapsed, request.method, route)
+        self.sql_queries.observe(len(queries), route)
+        self.sql_time.observe(sql_seconds, route)
+
+        if self.slow_request_ms and elapsed * 1000 >= self.slow_request_ms:
+            self._log_slow_request(route, elapsed, sql_seconds, queries)
+
+    def _log_slow_request(self, route, elapsed, sql_seconds, queries):
+        lines = [f'Slow request {request.method} {request.path} ({route}): {elapsed * 1000:.1f} ms, '
+                 f'{len(queries)} SQL statement(s) taking {sql_seconds * 1000:.1f} ms']
+        repeated = Counter(statement for statement, _seconds in queries)
+        for statement, count in repeated.most_common():
+            if count < self.repeated_query_threshold:
+                break
+            lines.append(f'  repeated {count}x (possible N+1): {" ".join(statement.split())}')
+        for statement, seconds in sorted(queries, key=lambda query: -query[1])[:5]:
+            lines.append(f'  {seconds * 1000:8.2f} ms  {" ".join(statement.split())}')
+        self.logger.warning('\n'.join(lines))
+
+    def _after_request(self, response):
+        self._record(response.status_code)
+        return response
+
+    def _teardown_request(self, exc):
+        # after_request is skipped when a view raises; count those as 500s
+        if exc is not None:
+            self._record(500)
+
+
+def metrics_response(registry):
+    return Response(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
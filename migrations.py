@@ -0,0 +1,193 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, func, or_, text
+
+from models import db, today as utc_today, User, Vocabulary, PracticeSession, DailyActivity, DailySuggestion, UserLanguage, UserStats
+from stats import ACTIVITY_COLUMNS, BUCKET_COLUMNS, aggregate_daily_activity, aggregate_language_counts
+
+# Indexes replaced by newer ones; dropped when found in an existing database
+RETIRED_INDEXES = {
+    'vocabulary': ['ix_vocabulary_user_word', 'ix_vocabulary_user_proficiency_reviewed',
+                   'ix_vocabulary_user_created', 'ix_vocabulary_user_due'],
+    'daily_suggestion': ['uq_daily_suggestion_user_date_word'],
+}
+
+
+def remove_duplicate_suggestions():
+    """Keep the first of any duplicate (user_id, language, date, word) suggestions so the unique index can be built"""
+    keep = db.session.query(func.min(DailySuggestion.id)).group_by(
+        DailySuggestion.user_id, DailySuggestion.language, DailySuggestion.date, DailySuggestion.word)
+    removed = DailySuggestion.query.filter(DailySuggestion.id.not_in(keep)).delete(synchronize_session=False)
+    db.session.commit()
+    return removed
+
+
+def add_missing_columns(existing_tables):
+    """ALTER TABLE ... ADD COLUMN for model columns an existing table lacks"""
+    inspector = db.inspect(db.engine)
+    added = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in present:
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                db.session.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+                added.append(f'{table.name}.{column.name}')
+    db.session.commit()
+    return added
+
+
+def backfill_schedule():
+    """Give words created before spaced repetition a schedule: due since their last review"""
+    Vocabulary.query.filter(Vocabulary.due_at.is_(None)).update(
+        {Vocabulary.due_at: func.coalesce(Vocabulary.last_reviewed, Vocabulary.created_at, func.current_timestamp())},
+        synchronize_session=False)
+    Vocabulary.query.filter(Vocabulary.ease_factor.is_(None)).update({Vocabulary.ease_factor: 2.5},
+                                                                       synchronize_session=False)
+    Vocabulary.query.filter(Vocabulary.interval_days.is_(None)).update({Vocabulary.interval_days: 0},
+                                                                         synchronize_session=False)
+    Vocabulary.query.filter(Vocabulary.repetitions.is_(None)).update({Vocabulary.repetitions: 0},
+                                                                       synchronize_session=False)
+    db.session.commit()
+
+
+def backfill_suggestion_languages():
+    """Suggestions made before languages were tracked were in the user's target language"""
+    target_language = db.session.query(User.target_language).filter(
+        User.id == DailySuggestion.user_id).scalar_subquery()
+    DailySuggestion.query.filter(DailySuggestion.language.is_(None)).update(
+        {DailySuggestion.language: target_language}, synchronize_session=False)
+    db.session.commit()
+
+
+def backfill_user_languages():
+    """Create UserLanguage rows, with word counts, for each user's target language and vocabulary languages"""
+    rows = []
+    for user_id, target_language in db.session.query(User.id, User.target_language).yield_per(1000):
+        counts = aggregate_language_counts(user_id)
+        for language in sorted(set(counts) | {target_language or 'Spanish'}):
+            rows.append({'user_id': user_id, 'language': language,
+                         **{column: counts.get(language, {}).get(column, 0) for column in BUCKET_COLUMNS}})
+    if rows:
+        db.session.bulk_insert_mappings(UserLanguage, rows)
+    db.session.commit()
+    return len(rows)
+
+
+def backfill_daily_activity():
+    """Roll existing practice sessions up into DailyActivity rows, one grouped query per user"""
+    count = 0
+    user_ids = [user_id for (user_id,) in db.session.query(PracticeSession.user_id).distinct()]
+    for user_id in user_ids:
+        rows = [{'user_id': user_id, 'day': day, **{column: totals[column] for column in ACTIVITY_COLUMNS}}
+                for day, totals in aggregate_daily_activity(user_id).items()]
+        db.session.bulk_insert_mappings(DailyActivity, rows)
+        count += len(rows)
+    db.session.commit()
+    return count
+
+
+def upgrade_database():
+    """Bring an existing database up to the current models.
+
+    ``db.create_all()`` creates missing tables but never touches existing ones,
+    so columns and indexes added to existing tables are created here. Safe to
+    run repeatedly. Returns a description of each change made.
+    """
+    existing_tables = set(db.inspect(db.engine).get_table_names())
+    db.create_all()
+    changes = [f'column {name}' for name in add_missing_columns(existing_tables)]
+    if changes:
+        backfill_schedule()
+        backfill_suggestion_languages()
+    if UserLanguage.__tablename__ not in existing_tables and existing_tables:
+        changes.append(f'{backfill_user_languages()} user language row(s)')
+    if DailyActivity.__tablename__ not in existing_tables and existing_tables:
+        changes.append(f'{backfill_daily_activity()} daily activity row(s)')
+
+    existing = set()
+    inspector = db.inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        existing.update(index['name'] for index in inspector.get_indexes(table.name))
+
+    for table_name, names in RETIRED_INDEXES.items():
+        for name in names:
+            if name in existing:
+                db.session.execute(text(f'DROP INDEX "{name}"'))
+                changes.append(f'dropped index {name}')
+    db.session.commit()
+
+    if 'uq_daily_suggestion_user_language_date_word' not in existing:
+        remove_duplicate_suggestions()
+
+    for table in db.metadata.sorted_tables:
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if index.name not in existing:
+                index.create(bind=db.engine)
+                changes.append(f'index {index.name}')
+    return changes
+
+
+def hot_queries(user_id=1, language='Spanish'):
+    """The per-user lookups issued by the routes, as (description, statement) pairs"""
+    now = datetime.utcnow()
+    today = utc_today()
+    return [
+        ('vocabulary: list newest first',
+         Vocabulary.query.filter_by(user_id=user_id, language=language).order_by(Vocabulary.created_at.desc())),
+        ('vocabulary: keyset page after cursor',
+         Vocabulary.query.filter(Vocabulary.user_id == user_id, Vocabulary.language == language, or_(
+             Vocabulary.created_at < now,
+             and_(Vocabulary.created_at == now, Vocabulary.id < 1000)
+         )).order_by(Vocabulary.created_at.desc(), Vocabulary.id.desc()).limit(51)),
+        ('search_word / practice_result: find word',
+         Vocabulary.query.filter_by(user_id=user_id, language=language, word='hola')),
+        ('generate_daily_suggestions: known words',
+         Vocabulary.query.filter_by(user_id=user_id, language=language).with_entities(Vocabulary.word)),
+        ('pronunciation: words due for review',
+         Vocabulary.query.filter(Vocabulary.user_id == user_id, Vocabulary.language == language,
+                                 Vocabulary.due_at <= now).order_by(Vocabulary.due_at).limit(10)),
+        ('statistics: words added this week',
+         Vocabulary.query.filter(Vocabulary.user_id == user_id, Vocabulary.language == language,
+                                 Vocabulary.created_at >= now - timedelta(days=7))),
+        ('statistics: practice totals',
+         db.session.query(func.count(PracticeSession.id), func.sum(PracticeSession.words_practiced))
+         .filter(PracticeSession.user_id == user_id)),
+        ('statistics: last practice',
+         PracticeSession.query.filter_by(user_id=user_id).order_by(PracticeSession.session_date.desc()).limit(1)),
+        ('daily_words: today\'s suggestions',
+         DailySuggestion.query.filter_by(user_id=user_id, language=language, date=today)),
+        ('practice_result: mark suggestion practiced',
+         DailySuggestion.query.filter_by(user_id=user_id, language=language, word='hola', date=today)),
+        ('statistics: summary row',
+         UserStats.query.filter_by(user_id=user_id)),
+        ('statistics: words by language',
+         UserLanguage.query.filter_by(user_id=user_id).order_by(UserLanguage.added_at)),
+        ('activity: calendar days',
+         DailyActivity.query.filter(DailyActivity.user_id == user_id, DailyActivity.day >= today - timedelta(days=364),
+                                    DailyActivity.day <= today).order_by(DailyActivity.day)),
+    ]
+
+
+def explain_query_plan(query):
+    """Return SQLite's EXPLAIN QUERY PLAN detail lines for an ORM query"""
+    compiled = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True})
+    rows = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}').fetchall()
+    return [row[-1] for row in rows]
+
+
+def check_query_plans(user_id=1):
+    """Explain every hot query and report the ones that fall back to a full scan.
+
+    Returns a list of (description, plan lines, ok) tuples. A plan is ok when no
+    step is a ``SCAN`` (full table or full index walk); index ``SEARCH`` steps
+    and temporary sort b-trees are fine.
+    """
+    results = []
+    for description, query in hot_queries(user_id):
+        plan = explain_query_plan(query)
+        ok = not any(line.startswith('SCAN ') for line in plan)
+        results.append((description, plan, ok))
+    return results
@@ -6,6 +6,11 @@ from werkzeug.security import generate_password_hash, check_password_hash
 db = SQLAlchemy()
 
 
+def today():
+    """The current UTC date: the one "today" for suggestions, practice, activity rollups and ETags"""
+    return datetime.utcnow().date()
+
+
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -17,6 +22,7 @@ class User(UserMixin, db.Model):
 
     vocabularies = db.relationship('Vocabulary', backref='user', lazy=True)
     practice_sessions = db.relationship('PracticeSession', backref='user', lazy=True)
+    languages = db.relationship('UserLanguage', backref='user', lazy=True, order_by='UserLanguage.added_at')
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -25,23 +31,59 @@ class User(UserMixin, db.Model):
         return check_password_hash(self.password_hash, password)
 
 
+class UserLanguage(db.Model):
+    """A language the user studies, with its per-language word counters (maintained like UserStats).
+
+    ``User.target_language`` is the one currently active; vocabulary, suggestions,
+    practice and statistics pages are scoped to it.
+    """
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    language = db.Column(db.String(50), primary_key=True)
+    added_at = db.Column(db.DateTime, default=datetime.utcnow)
+    beginner_words = db.Column(db.Integer, default=0, nullable=False)  # proficiency 0-2
+    intermediate_words = db.Column(db.Integer, default=0, nullable=False)  # proficiency 2-4
+    advanced_words = db.Column(db.Integer, default=0, nullable=False)  # proficiency 4-5
+
+    @property
+    def total_words(self):
+        return self.beginner_words + self.intermediate_words + self.advanced_words
+
+
 class Vocabulary(db.Model):
+    # Every per-user lookup is scoped to one language, so indexes lead with (user_id, language)
+    __table_args__ = (
+        db.Index('ix_vocabulary_user_language_word', 'user_id', 'language', 'word'),
+        db.Index('ix_vocabulary_user_language_proficiency', 'user_id', 'language', 'proficiency', 'last_reviewed'),
+        db.Index('ix_vocabulary_user_language_created', 'user_id', 'language', 'created_at'),
+        db.Index('ix_vocabulary_user_language_due', 'user_id', 'language', 'due_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     word = db.Column(db.String(100), nullable=False)
     translation = db.Column(db.String(100), nullable=False)
     language = db.Column(db.String(50), nullable=False)
     context = db.Column(db.Text)
-    proficiency = db.Column(db.Integer, default=0)  # 0-5 scale
+    proficiency = db.Column(db.Float, default=0)  # 0-5 scale
     last_reviewed = db.Column(db.DateTime, default=datetime.utcnow)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     review_count = db.Column(db.Integer, default=0)
 
+    # Spaced repetition (SM-2) state, see srs.py
+    ease_factor = db.Column(db.Float, default=2.5)
+    interval_days = db.Column(db.Float, default=0)
+    repetitions = db.Column(db.Integer, default=0)  # consecutive correct reviews
+    due_at = db.Column(db.DateTime, default=datetime.utcnow)
+
     def __repr__(self):
         return f'<Vocabulary {self.word}>'
 
 
 class PracticeSession(db.Model):
+    __table_args__ = (
+        db.Index('ix_practice_session_user_date', 'user_id', 'session_date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     session_date = db.Column(db.DateTime, default=datetime.utcnow)
@@ -50,10 +92,45 @@ class PracticeSession(db.Model):
     session_duration = db.Column(db.Integer, default=0)  # in seconds
 
 
+class DailyActivity(db.Model):
+    """Per-user, per-day (UTC) practice totals, updated with each PracticeSession; drives streaks and the heatmap"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    sessions = db.Column(db.Integer, default=0, nullable=False)
+    words_practiced = db.Column(db.Integer, default=0, nullable=False)
+    correct_pronunciations = db.Column(db.Integer, default=0, nullable=False)
+    session_duration = db.Column(db.Integer, default=0, nullable=False)  # in seconds
+
+
 class DailySuggestion(db.Model):
+    __table_args__ = (
+        db.Index('uq_daily_suggestion_user_language_date_word', 'user_id', 'language', 'date', 'word', unique=True),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    language = db.Column(db.String(50))
     word = db.Column(db.String(100), nullable=False)
     translation = db.Column(db.String(100), nullable=False)
-    date = db.Column(db.Date, default=datetime.utcnow().date)
-    practiced = db.Column(db.Boolean, default=False)
\ No newline at end of file
+    date = db.Column(db.Date, default=today)
+    practiced = db.Column(db.Boolean, default=False)
+
+
+class UserStats(db.Model):
+    """Per-user progress counters, updated in the same transaction as each write"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    beginner_words = db.Column(db.Integer, default=0, nullable=False)  # proficiency 0-2
+    intermediate_words = db.Column(db.Integer, default=0, nullable=False)  # proficiency 2-4
+    advanced_words = db.Column(db.Integer, default=0, nullable=False)  # proficiency 4-5
+    total_sessions = db.Column(db.Integer, default=0, nullable=False)
+    total_words_practiced = db.Column(db.Integer, default=0, nullable=False)
+    current_streak = db.Column(db.Integer, default=0, nullable=False)  # consecutive days ending on last_practice_date
+    last_practice_date = db.Column(db.Date)
+    last_practice = db.Column(db.DateTime)
+    # Bumped with every change to the user's data; drives ETags and the page cache (see http_cache.py)
+    data_version = db.Column(db.Integer, default=0)
+    data_updated_at = db.Column(db.DateTime)
+
+    @property
+    def total_words(self):
+        return self.beginner_words + self.intermediate_words + self.advanced_words
@@ -0,0 +1,69 @@
+import base64
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+from models import Vocabulary
+
+# Proficiency filters offered on the vocabulary page (same buckets as the statistics page)
+PROFICIENCY_LEVELS = {
+    'beginner': lambda: Vocabulary.proficiency <= 2,
+    'intermediate': lambda: and_(Vocabulary.proficiency > 2, Vocabulary.proficiency <= 4),
+    'advanced': lambda: Vocabulary.proficiency > 4,
+}
+
+
+class InvalidCursor(ValueError):
+    """A cursor that encode_cursor did not produce (tampered with or truncated)"""
+
+
+def encode_cursor(vocab):
+    raw = f'{vocab.created_at.isoformat()}|{vocab.id}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (created_at, id) from a cursor, or None if it is missing; raises InvalidCursor if it is malformed"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        created_at, vocab_id = raw.split('|')
+        created_at, vocab_id = datetime.fromisoformat(created_at), int(vocab_id)
+    except ValueError:
+        raise InvalidCursor(cursor) from None
+    # Timestamps are stored naive (UTC) and ids must fit the column
+    if created_at.tzinfo is not None or not 0 < vocab_id < 2 ** 63:
+        raise InvalidCursor(cursor)
+    return created_at, vocab_id
+
+
+def paginate_vocabulary(user_id, language, cursor=None, limit=50, prefix=None, proficiency=None):
+    """Return one page of a user's vocabulary in ``language``, newest first, and the cursor for the next page.
+
+    Uses keyset pagination on (created_at, id) so every page is an index range
+    scan on (user_id, language, created_at) no matter how deep the user
+    scrolls; filtering happens in SQL. Raises InvalidCursor for a malformed
+    ``cursor``.
+    """
+    query = Vocabulary.query.filter(Vocabulary.user_id == user_id, Vocabulary.language == language)
+
+    if prefix:
+        prefix = prefix.strip().lower()
+        query = query.filter(Vocabulary.word >= prefix, Vocabulary.word < prefix + '\U0010ffff')
+    if proficiency in PROFICIENCY_LEVELS:
+        query = query.filter(PROFICIENCY_LEVELS[proficiency]())
+
+    position = decode_cursor(cursor)
+    if position:
+        created_at, vocab_id = position
+        query = query.filter(or_(
+            Vocabulary.created_at < created_at,
+            and_(Vocabulary.created_at == created_at, Vocabulary.id < vocab_id)
+        ))
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.order_by(Vocabulary.created_at.desc(), Vocabulary.id.desc()).limit(limit + 1).all()
+    items = rows[:limit]
+    next_cursor = encode_cursor(items[-1]) if len(rows) > limit else None
+    return items, next_cursor
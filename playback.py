@@ -0,0 +1,241 @@
+import itertools
+import platform
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+
+# Command line players tried on Linux, in order of preference (mpg123 decodes mp3 natively)
+LINUX_PLAYERS = ['mpg123', 'paplay', 'aplay']
+SYSTEM_PLAYERS = ['afplay'] + LINUX_PLAYERS
+
+
+def detect_audio_player():
+    """Probe the available playback methods once and return the first that works, or None"""
+
+    # Method 1: Try pygame
+    try:
+        import pygame
+        pygame.init()
+        pygame.mixer.init()
+        print("✅ Audio player initialized: pygame")
+        return 'pygame'
+    except ImportError:
+        print("⚠️ pygame not installed")
+    except Exception as e:
+        print(f"⚠️ pygame initialization failed: {e}")
+
+    # Method 2: Try playsound (lightweight alternative)
+    try:
+        from playsound import playsound
+        print("✅ Audio player initialized: playsound")
+        return 'playsound'
+    except ImportError:
+        print("⚠️ playsound not installed")
+
+    # Method 3: Try simpleaudio
+    try:
+        import simpleaudio as sa
+        print("✅ Audio player initialized: simpleaudio")
+        return 'simpleaudio'
+    except ImportError:
+        print("⚠️ simpleaudio not installed")
+
+    # Method 4: Windows native (winsound)
+    if platform.system() == 'Windows':
+        try:
+            import winsound
+            print("✅ Audio player initialized: winsound (Windows native)")
+            return 'winsound'
+        except ImportError:
+            print("⚠️ winsound not available")
+
+    # Method 5: macOS native (afplay)
+    if platform.system() == 'Darwin':  # macOS
+        print("✅ Audio player initialized: afplay (macOS native)")
+        return 'afplay'
+
+    # Method 6: Linux native, resolved once instead of trying each player per request
+    if platform.system() == 'Linux':
+        for player in LINUX_PLAYERS:
+            if shutil.which(player):
+                print(f"✅ Audio player initialized: {player} (Linux native)")
+                return player
+
+    print("❌ No audio player available")
+    return None
+
+
+def play_audio_with_pygame(filename):
+    """Play audio using pygame"""
+    import pygame
+    pygame.mixer.music.load(filename)
+    pygame.mixer.music.play()
+    while pygame.mixer.music.get_busy():
+        pygame.time.wait(100)
+    return True
+
+
+def play_audio_with_playsound(filename):
+    """Play audio using playsound"""
+    from playsound import playsound
+    playsound(filename)
+    return True
+
+
+def play_audio_with_simpleaudio(filename):
+    """Play audio using simpleaudio"""
+    import simpleaudio as sa
+    wave_obj = sa.WaveObject.from_wave_file(filename)
+    play_obj = wave_obj.play()
+    play_obj.wait_done()
+    return True
+
+
+def play_audio_with_winsound(filename):
+    """Play audio using winsound (Windows)"""
+    import winsound
+    winsound.PlaySound(filename, winsound.SND_FILENAME)
+    return True
+
+
+def play_audio_with_system(player, filename):
+    """Play audio using a system command such as afplay or mpg123"""
+    subprocess.run([player, filename], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return True
+
+
+def play_audio(player, filename):
+    if player == 'pygame':
+        return play_audio_with_pygame(filename)
+    if player == 'playsound':
+        return play_audio_with_playsound(filename)
+    if player == 'simpleaudio':
+        return play_audio_with_simpleaudio(filename)
+    if player == 'winsound':
+        return play_audio_with_winsound(filename)
+    if player in SYSTEM_PLAYERS:
+        return play_audio_with_system(player, filename)
+    raise RuntimeError(f'Unsupported audio player: {player}')
+
+
+class PlaybackQueue:
+    """Plays audio files one at a time on a background worker thread.
+
+    Requests enqueue a file and return immediately with a job id; the job's
+    status ('queued', 'playing', 'done' or 'failed') can be polled afterwards.
+    The queue is bounded so a flood of requests is rejected instead of piling
+    up minutes of audio.
+    """
+
+    def __init__(self, player, maxsize=16, history=256, on_played=None):
+        self.player = player
+        self.history = history
+        # Called with (seconds spent playing, final status) after each job
+        self.on_played = on_played
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='audio-playback', daemon=True)
+            self._thread.start()
+        return self
+
+    def enqueue(self, filename, label=None):
+        """Queue a file for playback and return its job id (raises ``queue.Full``)"""
+        with self._lock:
+            job_id = str(next(self._ids))
+            job = {'id': job_id, 'label': label, 'status': 'queued', 'error': None,
+                   'queued_at': time.time(), 'finished_at': None}
+            self._queue.put_nowait((job_id, filename))
+            self._jobs[job_id] = job
+            while len(self._jobs) > self.history:
+                self._jobs.popitem(last=False)
+        return job_id
+
+    def status(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def _run(self):
+        while True:
+            job_id, filename = self._queue.get()
+            self._update(job_id, status='playing')
+            started = time.perf_counter()
+            status = 'done'
+            try:
+                play_audio(self.player, filename)
+                self._update(job_id, status='done', finished_at=time.time())
+            except Exception as e:
+                status = 'failed'
+                print(f"{self.player} playback failed: {e}")
+                self._update(job_id, status='failed', error=str(e), finished_at=time.time())
+            finally:
+                self._queue.task_done()
+            if self.on_played:
+                self.on_played(time.perf_counter() - started, status)
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+
+class LazyPlayback:
+    """Server-side playback that probes for an audio player on first use.
+
+    Probing can import pygame and open the audio device, which is slow and
+    may fail on headless hosts, so nothing happens until a pronunciation is
+    actually played. CLI commands, tests and browser-mode workers never pay
+    for it. ``player`` skips probing and uses that player directly.
+    """
+
+    def __init__(self, enabled=True, player=None, maxsize=16, on_played=None, detect=detect_audio_player):
+        self.enabled = enabled
+        self._player = player
+        self._maxsize = maxsize
+        self._on_played = on_played
+        self._detect = detect
+        self._queue = None
+        self._resolved = False
+        self._lock = threading.Lock()
+
+    def get(self):
+        """The started PlaybackQueue, or None if playback is disabled or no player exists"""
+        if not self._resolved:
+            with self._lock:
+                if not self._resolved:
+                    player = (self._player or self._detect()) if self.enabled else None
+                    if player:
+                        self._queue = PlaybackQueue(player, maxsize=self._maxsize,
+                                                    on_played=self._on_played).start()
+                    self._resolved = True
+        return self._queue
+
+    @property
+    def resolved(self):
+        return self._resolved
+
+    @property
+    def player(self):
+        playback_queue = self.get()
+        return playback_queue.player if playback_queue else None
+
+    @property
+    def pending(self):
+        # Read by metrics scrapes, which must not trigger probing
+        return self._queue.pending if self._queue else 0
+
+    def status(self, job_id):
+        return self._queue.status(job_id) if self._queue else None
@@ -0,0 +1,90 @@
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import update
+
+from models import db, today, Vocabulary, PracticeSession, DailySuggestion
+from srs import QUALITY_CORRECT, QUALITY_INCORRECT, CardState, SchedulerParams, schedule
+from stats import record_practice, record_proficiency_changes
+
+MAX_PROFICIENCY = 5
+CORRECT_STEP = 0.5
+INCORRECT_STEP = 0.2
+MAX_BATCH_SIZE = 500
+MAX_SESSION_SECONDS = 4 * 3600
+
+
+def updated_proficiency(proficiency, correct):
+    if correct:
+        return min(MAX_PROFICIENCY, proficiency + CORRECT_STEP)
+    return max(0, proficiency - INCORRECT_STEP)
+
+
+def record_practice_results(user_id, language, results, duration=0, when=None, params=SchedulerParams()):
+    """Apply a practice session's results in one transaction.
+
+    ``results`` is a list of (word, correct) pairs in ``language``, in the order they were
+    practiced. Proficiency, review counts and the spaced-repetition schedule
+    are written with a single bulk UPDATE (a word missed at any point in the
+    session counts as a lapse), matching daily suggestions are flagged with
+    another, and one PracticeSession row records the whole session and is added
+    to the day's DailyActivity rollup. Returns the set of words that were found
+    in the user's vocabulary.
+    """
+    when = when or datetime.utcnow()
+    outcomes = defaultdict(list)
+    for word, correct in results:
+        outcomes[word.lower().strip()].append(bool(correct))
+    words = list(outcomes)
+
+    rows = db.session.query(
+        Vocabulary.id, Vocabulary.word, Vocabulary.proficiency, Vocabulary.review_count,
+        Vocabulary.ease_factor, Vocabulary.interval_days, Vocabulary.repetitions, Vocabulary.due_at
+    ).filter(Vocabulary.user_id == user_id, Vocabulary.language == language, Vocabulary.word.in_(words)).all()
+
+    changes = []
+    vocabulary_updates = []
+    for row in rows:
+        proficiency = row.proficiency or 0
+        for correct in outcomes[row.word]:
+            proficiency = updated_proficiency(proficiency, correct)
+        quality = QUALITY_CORRECT if all(outcomes[row.word]) else QUALITY_INCORRECT
+        card = schedule(CardState(row.ease_factor, row.interval_days, row.repetitions, row.due_at), quality, when, params)
+        vocabulary_updates.append({
+            'id': row.id,
+            'proficiency': proficiency,
+            'review_count': (row.review_count or 0) + len(outcomes[row.word]),
+            'last_reviewed': when,
+            'ease_factor': card.ease_factor,
+            'interval_days': card.interval_days,
+            'repetitions': card.repetitions,
+            'due_at': card.due_at,
+        })
+        changes.append((language, row.proficiency, proficiency))
+
+    if vocabulary_updates:
+        # Counters first: a missing summary row is built from the vocabulary as it was before this session
+        record_proficiency_changes(user_id, changes)
+        db.session.execute(update(Vocabulary), vocabulary_updates)
+
+    DailySuggestion.query.filter(
+        DailySuggestion.user_id == user_id,
+        DailySuggestion.language == language,
+        DailySuggestion.date == today(),
+        DailySuggestion.word.in_(words)
+    ).update({DailySuggestion.practiced: True}, synchronize_session=False)
+
+    session_record = PracticeSession(
+        user_id=user_id,
+        session_date=when,
+        words_practiced=len(results),
+        correct_pronunciations=sum(1 for _word, correct in results if correct),
+        session_duration=int(min(max(duration, 0), MAX_SESSION_SECONDS))
+    )
+    db.session.add(session_record)
+    record_practice(user_id, session_record.words_practiced, when,
+                    correct_pronunciations=session_record.correct_pronunciations,
+                    session_duration=session_record.session_duration)
+    db.session.commit()
+
+    return {row.word for row in rows}
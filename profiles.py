@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, has_request_context
+from flask_login import UserMixin
+from sqlalchemy import event
+
+
+def remember_active_language(user_id, language):
+    """Use a target language read from the database this request instead of the cached profile's"""
+    if has_request_context():
+        g.setdefault('active_languages', {})[user_id] = language
+
+
+class UserProfile(UserMixin):
+    """Read-only snapshot of the User columns requests need, safe to share between threads.
+
+    ``target_language`` is the only setting that changes after registration.
+    Switching it invalidates the profile in the switching worker; other
+    workers pick it up from the data-version lookup on their next ETag-checked
+    page (see http_cache), and otherwise within the cache TTL.
+    """
+
+    # Columns copied from User; target_language is exposed through the property below
+    FIELDS = ('id', 'username', 'email', 'native_language', 'created_at')
+    __slots__ = FIELDS + ('_target_language',)
+
+    def __init__(self, user):
+        for name in self.FIELDS:
+            object.__setattr__(self, name, getattr(user, name))
+        object.__setattr__(self, '_target_language', user.target_language)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('UserProfile is read-only; update the User row instead')
+
+    @property
+    def target_language(self):
+        """The snapshot, unless this request read a fresher value (remember_active_language)"""
+        if has_request_context():
+            return g.get('active_languages', {}).get(self.id, self._target_language)
+        return self._target_language
+
+    def __repr__(self):
+        return f'<UserProfile {self.username}>'
+
+
+class ProfileCache:
+    """Process-local TTL + LRU cache of UserProfile objects keyed by user id.
+
+    ``load_user`` runs on every authenticated request; serving it from here
+    saves a User query on the high-frequency JSON endpoints. Entries expire
+    after ``ttl`` seconds and the least recently used are dropped beyond
+    ``max_entries``. Updating a User row through the ORM invalidates its entry
+    in this process (see ``watch``), but other worker processes keep theirs
+    until it expires or, for the target language, until a page's data-version
+    lookup notices the change (see UserProfile). ``ttl=0`` disables caching.
+    """
+
+    def __init__(self, ttl=60, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id, load):
+        """The cached profile for ``user_id``, calling ``load(user_id)`` for a User on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        user = load(user_id)
+        if user is None:
+            return None
+        profile = UserProfile(user)
+        if self.ttl > 0:
+            with self._lock:
+                self._entries[user_id] = (now + self.ttl, profile)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return profile
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def watch(self, model):
+        """Invalidate a user's entry whenever their row is updated or deleted through the ORM"""
+        def forget(_mapper, _connection, target):
+            self.invalidate(target.id)
+        event.listen(model, 'after_update', forget)
+        event.listen(model, 'after_delete', forget)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
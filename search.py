@@ -0,0 +1,184 @@
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Any, NamedTuple
+
+# Kana voicing marks are meaningful, unlike Latin accents, so they survive normalization
+_KEEP_MARKS = {'\u3099', '\u309a'}
+
+
+def normalize(text):
+    """Fold text for matching: case, accents, katakana vs hiragana, hangul syllables to jamo.
+
+    NFKD splits accented letters into base + combining mark (the marks are
+    dropped) and hangul syllables into their jamo, so a one-letter typo in a
+    Korean word is a small edit distance instead of a whole different syllable.
+    """
+    folded = []
+    for char in unicodedata.normalize('NFKD', text.casefold().strip()):
+        if unicodedata.combining(char) and char not in _KEEP_MARKS:
+            continue
+        if '\u30a1' <= char <= '\u30f6':  # katakana -> hiragana
+            char = chr(ord(char) - 0x60)
+        folded.append(char)
+    return ' '.join(''.join(folded).split())
+
+
+def grams(key):
+    """Trigrams of a normalized key, padded so short words and word starts still match"""
+    padded = f'\0\0{key}\0'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_levenshtein(a, b, limit):
+    """Edit distance between a and b, or limit + 1 as soon as it must exceed ``limit``"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class SearchResult(NamedTuple):
+    word: str
+    payload: Any
+    match: str  # 'exact', 'prefix' or 'fuzzy'
+    distance: int
+
+
+class SearchIndex:
+    """Prefix and typo-tolerant search over a fixed word list.
+
+    Prefix matches come from a sorted array of normalized keys (a flattened
+    trie: every key sharing a prefix is one contiguous ``bisect`` range).
+    Fuzzy matches use a trigram inverted index to shortlist candidates that
+    share enough trigrams with the query, then rank them by edit distance.
+
+    Subclasses can serve the same search from other storage by overriding
+    the accessors (``_sorted_keys``, ``_sorted_entry``, ``_key``, ``_postings_for``
+    and ``_result``); see catalog.MappedSearchIndex.
+    """
+
+    # Candidates scored with edit distance per query; bounds worst-case latency
+    MAX_CANDIDATES = 200
+
+    def __init__(self, entries):
+        self._words = []
+        self._payloads = []
+        self._keys = []
+        postings = defaultdict(list)
+        for word, payload in entries:
+            key = normalize(word)
+            if not key:
+                continue
+            position = len(self._words)
+            self._words.append(word)
+            self._payloads.append(payload)
+            self._keys.append(key)
+            for gram in grams(key):
+                postings[gram].append(position)
+        self._postings = dict(postings)
+        self._sorted = sorted((key, position) for position, key in enumerate(self._keys))
+        self._sorted_keys = [key for key, _position in self._sorted]
+
+    def __len__(self):
+        return len(self._words)
+
+    def _sorted_entry(self, cursor):
+        """(key, position) at ``cursor`` in key order"""
+        return self._sorted[cursor]
+
+    def _key(self, position):
+        return self._keys[position]
+
+    def _postings_for(self, gram):
+        """Positions of the keys containing ``gram``"""
+        return self._postings.get(gram, ())
+
+    def _result(self, position, match, distance):
+        return SearchResult(self._words[position], self._payloads[position], match, distance)
+
+    def prefix(self, query, limit=10):
+        """Words whose normalized form starts with the query, shortest first"""
+        key = normalize(query)
+        if not key:
+            return []
+        matches = []
+        for cursor in range(bisect_left(self._sorted_keys, key), len(self._sorted_keys)):
+            stored_key, position = self._sorted_entry(cursor)
+            if not stored_key.startswith(key):
+                break
+            matches.append((len(stored_key), stored_key, position))
+            if len(matches) >= limit * 5:
+                break
+        matches.sort()
+        return [self._result(position, 'exact' if length == len(key) else 'prefix', length - len(key))
+                for length, _stored_key, position in matches[:limit]]
+
+    def fuzzy(self, query, limit=10, max_distance=None):
+        """Words within a small edit distance of the query, closest first"""
+        key = normalize(query)
+        if not key:
+            return []
+        if max_distance is None:
+            max_distance = 1 if len(key) <= 4 else 2
+
+        query_grams = grams(key)
+        # Every edit destroys at most 3 trigrams, so closer words must share at least this many
+        required = max(1, len(query_grams) - 3 * max_distance)
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self._postings_for(gram))
+
+        candidates = [position for position, count in shared.most_common(self.MAX_CANDIDATES) if count >= required]
+        scored = []
+        for position in candidates:
+            candidate_key = self._key(position)
+            distance = bounded_levenshtein(key, candidate_key, max_distance)
+            if distance <= max_distance:
+                scored.append((distance, len(candidate_key), position))
+        scored.sort()
+        return [self._result(position, 'exact' if distance == 0 else 'fuzzy', distance)
+                for distance, _length, position in scored[:limit]]
+
+    def search(self, query, limit=10):
+        """Exact matches, then prefix completions, then typo corrections"""
+        results = {}
+        for result in self.prefix(query, limit) + self.fuzzy(query, limit):
+            existing = results.get(result.word)
+            if existing is None or _rank(result) < _rank(existing):
+                results[result.word] = result
+        return sorted(results.values(), key=_rank)[:limit]
+
+
+def _rank(result):
+    return ({'exact': 0, 'prefix': 1, 'fuzzy': 2}[result.match], result.distance, len(result.word))
+
+
+class SearchIndexCache:
+    """Search indexes built on demand and rebuilt when their version changes"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def get(self, name, version, build):
+        with self._lock:
+            cached = self._indexes.get(name)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        index = SearchIndex(build())
+        with self._lock:
+            if name not in self._indexes and len(self._indexes) >= self.max_entries:
+                self._indexes.pop(next(iter(self._indexes)))
+            self._indexes[name] = (version, index)
+        return index
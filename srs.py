@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from sqlalchemy import update
+
+from models import db, Vocabulary
+
+# Practice buttons are pass/fail; map them onto SM-2's 0-5 recall quality
+QUALITY_CORRECT = 4
+QUALITY_INCORRECT = 2
+
+
+class SchedulerParams(NamedTuple):
+    first_interval: float = 1.0  # days after the first correct review
+    second_interval: float = 6.0  # days after the second
+    initial_ease: float = 2.5
+    min_ease: float = 1.3
+    max_interval: float = 365.0
+
+
+class CardState(NamedTuple):
+    ease_factor: float
+    interval_days: float
+    repetitions: int
+    due_at: datetime
+
+
+def interval_for(repetitions, ease_factor, params):
+    """SM-2 interval after ``repetitions`` consecutive correct reviews"""
+    if repetitions <= 0:
+        return 0.0
+    if repetitions == 1:
+        return params.first_interval
+    interval = params.second_interval * ease_factor ** (repetitions - 2)
+    return min(interval, params.max_interval)
+
+
+def schedule(state, quality, now, params=SchedulerParams()):
+    """Apply one review with recall ``quality`` (0-5) and return the new CardState"""
+    ease = state.ease_factor or params.initial_ease
+    ease = max(params.min_ease, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+    if quality >= 3:
+        repetitions = (state.repetitions or 0) + 1
+        interval = interval_for(repetitions, ease, params)
+    else:
+        # A lapse restarts the sequence; the word comes back tomorrow
+        repetitions = 0
+        interval = params.first_interval
+
+    return CardState(ease, interval, repetitions, now + timedelta(days=interval))
+
+
+def due_words(user_id, language, limit=10, now=None):
+    """Words in ``language`` due for review, most overdue first: one range scan on (user_id, language, due_at)"""
+    now = now or datetime.utcnow()
+    return Vocabulary.query.filter(
+        Vocabulary.user_id == user_id,
+        Vocabulary.language == language,
+        Vocabulary.due_at <= now
+    ).order_by(Vocabulary.due_at).limit(limit).all()
+
+
+def reschedule_all(params=SchedulerParams(), chunk_size=5000, progress=None):
+    """Recompute every word's interval and due date after scheduler parameters change.
+
+    Walks the vocabulary table in primary-key chunks and writes each chunk
+    back with one executemany UPDATE, so memory stays bounded and the work is
+    a few statements per thousand rows rather than one per word. Words that
+    are not in a correct streak keep their due date. Returns the number of
+    rows updated.
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        rows = db.session.query(
+            Vocabulary.id, Vocabulary.ease_factor, Vocabulary.repetitions,
+            Vocabulary.last_reviewed, Vocabulary.created_at
+        ).filter(Vocabulary.id > last_id, Vocabulary.repetitions > 0).order_by(Vocabulary.id).limit(chunk_size).all()
+        if not rows:
+            break
+
+        changes = []
+        for row in rows:
+            ease = max(params.min_ease, row.ease_factor or params.initial_ease)
+            interval = interval_for(row.repetitions, ease, params)
+            reviewed = row.last_reviewed or row.created_at or datetime.utcnow()
+            changes.append({'id': row.id, 'ease_factor': ease, 'interval_days': interval,
+                            'due_at': reviewed + timedelta(days=interval)})
+        db.session.execute(update(Vocabulary), changes)
+        db.session.commit()
+
+        updated += len(changes)
+        last_id = rows[-1].id
+        if progress:
+            progress(updated)
+    return updated
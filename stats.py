@@ -0,0 +1,487 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.exc import IntegrityError
+
+from models import db, today as utc_today, DailyActivity, Vocabulary, PracticeSession, UserLanguage, UserStats
+
+PROFICIENCY_BUCKETS = ['Beginner (0-2)', 'Intermediate (2-4)', 'Advanced (4-5)']
+BUCKET_COLUMNS = ['beginner_words', 'intermediate_words', 'advanced_words']
+SUMMARY_COLUMNS = BUCKET_COLUMNS + ['total_sessions', 'total_words_practiced', 'current_streak',
+                                    'last_practice_date', 'last_practice']
+ACTIVITY_COLUMNS = ['sessions', 'words_practiced', 'correct_pronunciations', 'session_duration']
+ACTIVITY_DAYS = 365
+
+# Per-process memo of computed statistics: user_id -> {language: (computed_at, data_version, stats)}
+_cache = {}
+_cache_lock = threading.Lock()
+CACHE_TTL = 300  # seconds; bounds staleness of the rolling "last 7 days" count
+
+
+def proficiency_bucket(proficiency):
+    """Name of the UserStats column counting words at this proficiency"""
+    proficiency = proficiency or 0
+    if proficiency <= 2:
+        return 'beginner_words'
+    if proficiency <= 4:
+        return 'intermediate_words'
+    return 'advanced_words'
+
+
+def streak_runs(days):
+    """(longest, latest) run lengths of consecutive dates in an ascending list of distinct dates"""
+    longest = run = 0
+    previous = None
+    for day in days:
+        run = run + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = day
+    return longest, run
+
+
+def compute_streak(practice_days):
+    """Length of the run of consecutive days ending at the most recent one"""
+    days = sorted(set(practice_days), reverse=True)
+    if not days:
+        return 0
+    streak = 1
+    for previous, day in zip(days, days[1:]):
+        if previous - day != timedelta(days=1):
+            break
+        streak += 1
+    return streak
+
+
+def _as_date(value):
+    # func.date() returns a string on SQLite and a date elsewhere
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _count_where(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _bucket_counts():
+    return (_count_where(Vocabulary.proficiency <= 2),
+            _count_where(and_(Vocabulary.proficiency > 2, Vocabulary.proficiency <= 4)),
+            _count_where(Vocabulary.proficiency > 4))
+
+
+def aggregate_language_counts(user_id, language=None):
+    """{language: {bucket column: count}} for a user's vocabulary, from one grouped query"""
+    query = db.session.query(Vocabulary.language, *_bucket_counts()).filter(Vocabulary.user_id == user_id)
+    if language is not None:
+        query = query.filter(Vocabulary.language == language)
+    return {row[0]: dict(zip(BUCKET_COLUMNS, row[1:])) for row in query.group_by(Vocabulary.language)}
+
+
+def aggregate_user_statistics(user_id, now=None):
+    """Compute the dashboard numbers from the raw tables with aggregate queries.
+
+    Proficiency buckets and the recent-words count are derived in a single pass
+    over the user's vocabulary using CASE expressions, and the practice totals
+    come from one aggregate over their practice sessions. Used to build and
+    verify the ``UserStats`` summary rows.
+    """
+    now = now or datetime.utcnow()
+    last_week = now - timedelta(days=7)
+
+    beginner, intermediate, advanced, recent_words = db.session.query(
+        *_bucket_counts(),
+        _count_where(Vocabulary.created_at >= last_week),
+    ).filter(Vocabulary.user_id == user_id).one()
+
+    total_sessions, total_words_practiced, last_practice = db.session.query(
+        func.count(PracticeSession.id),
+        func.coalesce(func.sum(PracticeSession.words_practiced), 0),
+        func.max(PracticeSession.session_date),
+    ).filter(PracticeSession.user_id == user_id).one()
+
+    practice_days = [_as_date(day) for (day,) in db.session.query(
+        func.date(PracticeSession.session_date)).filter(PracticeSession.user_id == user_id).distinct()]
+
+    return {
+        'beginner_words': beginner,
+        'intermediate_words': intermediate,
+        'advanced_words': advanced,
+        'recent_words': recent_words,
+        'total_sessions': total_sessions,
+        'total_words_practiced': total_words_practiced,
+        'current_streak': compute_streak(practice_days),
+        'last_practice_date': max(practice_days) if practice_days else None,
+        'last_practice': last_practice,
+    }
+
+
+def aggregate_daily_activity(user_id):
+    """{day: {activity column: total}} for a user's practice sessions, from one grouped query"""
+    day = func.date(PracticeSession.session_date)
+    rows = db.session.query(
+        day,
+        func.count(PracticeSession.id),
+        func.coalesce(func.sum(PracticeSession.words_practiced), 0),
+        func.coalesce(func.sum(PracticeSession.correct_pronunciations), 0),
+        func.coalesce(func.sum(PracticeSession.session_duration), 0),
+    ).filter(PracticeSession.user_id == user_id).group_by(day)
+    return {_as_date(row[0]): dict(zip(ACTIVITY_COLUMNS, row[1:])) for row in rows}
+
+
+def _ensure_summary_rows(user_id, languages=()):
+    """Return the user's (UserStats, {language: UserLanguage}) rows, creating missing ones from the raw tables"""
+    # Count only what is already in the database; the caller's pending change
+    # is applied on top as an increment like for any existing row. All missing
+    # rows are built before the flush, which also writes that pending change.
+    missing = []
+    with db.session.no_autoflush:
+        summary = db.session.get(UserStats, user_id)
+        if summary is None:
+            values = aggregate_user_statistics(user_id)
+            summary = UserStats(user_id=user_id, **{column: values[column] for column in SUMMARY_COLUMNS})
+            missing.append(summary)
+        rows = {}
+        for language in languages:
+            rows[language] = db.session.get(UserLanguage, (user_id, language))
+            if rows[language] is None:
+                counts = aggregate_language_counts(user_id, language).get(language, {})
+                rows[language] = UserLanguage(user_id=user_id, language=language,
+                                              **{column: counts.get(column, 0) for column in BUCKET_COLUMNS})
+                missing.append(rows[language])
+    if missing:
+        db.session.add_all(missing)
+        db.session.flush()
+    return summary, rows
+
+
+def _summary_row(user_id):
+    """Return the user's flushed UserStats row, building it from the raw tables if missing"""
+    return _ensure_summary_rows(user_id)[0]
+
+
+def _language_row(user_id, language):
+    """Return the user's flushed UserLanguage row for ``language``, building it from the raw tables if missing"""
+    return _ensure_summary_rows(user_id, [language])[1][language]
+
+
+def add_user_language(user_id, language):
+    """Start studying ``language``; a no-op if the user already does"""
+    return _language_row(user_id, language)
+
+
+def _increment_buckets(user_id, deltas_by_language):
+    """Apply {language: {bucket column: delta}} to the language rows and the user's totals"""
+    deltas_by_language = {language: {column: delta for column, delta in deltas.items() if delta}
+                          for language, deltas in deltas_by_language.items()}
+    deltas_by_language = {language: deltas for language, deltas in deltas_by_language.items() if deltas}
+    if not deltas_by_language:
+        return
+    _ensure_summary_rows(user_id, list(deltas_by_language))
+    totals = Counter()
+    for language, deltas in deltas_by_language.items():
+        UserLanguage.query.filter_by(user_id=user_id, language=language).update(
+            {getattr(UserLanguage, column): getattr(UserLanguage, column) + delta for column, delta in deltas.items()})
+        totals.update(deltas)
+    totals = {column: delta for column, delta in totals.items() if delta}
+    _update_summary(user_id, totals)
+
+
+def _version_bump():
+    return {UserStats.data_version: func.coalesce(UserStats.data_version, 0) + 1,
+            UserStats.data_updated_at: datetime.utcnow()}
+
+
+def _increment(user_id, **deltas):
+    _summary_row(user_id)
+    _update_summary(user_id, deltas)
+
+
+def _update_summary(user_id, deltas):
+    """Add ``deltas`` to the user's existing UserStats row and bump its data version"""
+    values = {getattr(UserStats, column): getattr(UserStats, column) + delta for column, delta in deltas.items()}
+    values.update(_version_bump())
+    UserStats.query.filter_by(user_id=user_id).update(values)
+
+
+def touch_user_data(user_id):
+    """Bump the user's data version for a change that does not move any counter"""
+    _increment(user_id)
+
+
+def record_word_added(user_id, language, proficiency):
+    record_words_added(user_id, [(language, proficiency)])
+
+
+def record_words_added(user_id, words):
+    """Count a batch of new (language, proficiency) words, one UPDATE per language; call before inserting them"""
+    deltas = defaultdict(Counter)
+    for language, proficiency in words:
+        deltas[language][proficiency_bucket(proficiency)] += 1
+    _increment_buckets(user_id, deltas)
+
+
+def record_word_removed(user_id, language, proficiency):
+    _increment_buckets(user_id, {language: {proficiency_bucket(proficiency): -1}})
+
+
+def record_proficiency_changes(user_id, changes):
+    """Move words between buckets for an iterable of (language, old, new) proficiencies"""
+    deltas = defaultdict(Counter)
+    for language, old_proficiency, new_proficiency in changes:
+        old_bucket, new_bucket = proficiency_bucket(old_proficiency), proficiency_bucket(new_proficiency)
+        if old_bucket != new_bucket:
+            deltas[language][old_bucket] -= 1
+            deltas[language][new_bucket] += 1
+    _increment_buckets(user_id, deltas)
+
+
+def record_proficiency_change(user_id, language, old_proficiency, new_proficiency):
+    record_proficiency_changes(user_id, [(language, old_proficiency, new_proficiency)])
+
+
+def _upsert_activity():
+    """INSERT that adds to the existing (user_id, day) row instead, or None if the dialect has no upsert"""
+    # Dialect modules are imported here; loading the PostgreSQL one costs ~60 ms at startup
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+    statement = dialect_insert(DailyActivity)
+    columns = DailyActivity.__table__.c
+    return statement.on_conflict_do_update(
+        index_elements=[columns.user_id, columns.day],
+        set_={column: columns[column] + statement.excluded[column] for column in ACTIVITY_COLUMNS})
+
+
+def record_activity(user_id, day, **deltas):
+    """Add a practice session's totals to the user's DailyActivity row for ``day``.
+
+    One upsert, so concurrent first sessions of a day add to the same row
+    instead of racing to insert it.
+    """
+    values = dict({column: deltas.get(column, 0) for column in ACTIVITY_COLUMNS}, sessions=1)
+    upsert = _upsert_activity()
+    if upsert is not None:
+        db.session.execute(upsert, dict(values, user_id=user_id, day=day))
+        return
+
+    increments = {getattr(DailyActivity, column): getattr(DailyActivity, column) + delta
+                  for column, delta in values.items()}
+    rows = DailyActivity.query.filter_by(user_id=user_id, day=day)
+    if rows.update(increments, synchronize_session=False):
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(DailyActivity(user_id=user_id, day=day, **values))
+    except IntegrityError:
+        # Another request inserted the row first
+        rows.update(increments, synchronize_session=False)
+
+
+def record_practice(user_id, words_practiced, when=None, correct_pronunciations=0, session_duration=0):
+    """Count a practice session, add it to the day's activity and extend (or restart) the daily streak.
+
+    Call after adding the PracticeSession to the session, before flushing it.
+    """
+    when = when or datetime.utcnow()
+    day = when.date()
+    # Build a missing summary row before record_activity's UPDATE autoflushes the caller's PracticeSession
+    row = _summary_row(user_id)
+    record_activity(user_id, day, words_practiced=words_practiced, correct_pronunciations=correct_pronunciations,
+                    session_duration=session_duration)
+
+    values = {
+        UserStats.total_sessions: UserStats.total_sessions + 1,
+        UserStats.total_words_practiced: UserStats.total_words_practiced + words_practiced,
+    }
+    if row.last_practice_date is None or day > row.last_practice_date:
+        consecutive = row.last_practice_date == day - timedelta(days=1)
+        values[UserStats.current_streak] = row.current_streak + 1 if consecutive else 1
+        values[UserStats.last_practice_date] = day
+        values[UserStats.last_practice] = when
+    elif day == row.last_practice_date and (row.last_practice is None or when > row.last_practice):
+        values[UserStats.last_practice] = when
+    values.update(_version_bump())
+    UserStats.query.filter_by(user_id=user_id).update(values)
+
+
+def effective_streak(summary, today=None):
+    """The stored streak only counts while the user practiced today or yesterday"""
+    today = today or utc_today()
+    if summary.last_practice_date and summary.last_practice_date >= today - timedelta(days=1):
+        return summary.current_streak
+    return 0
+
+
+def compute_user_statistics(user_id, now=None, language=None):
+    """Dashboard numbers from the summary rows plus a bounded last-7-days count.
+
+    Word counts come from the UserLanguage row for ``language`` (all languages
+    when it is None); practice totals and the streak are per user.
+    """
+    now = now or datetime.utcnow()
+    summary = db.session.get(UserStats, user_id)
+    languages = UserLanguage.query.filter_by(user_id=user_id).order_by(UserLanguage.added_at).all()
+    if summary is None or (language is not None and language not in {row.language for row in languages}):
+        summary = _summary_row(user_id)
+        if language is not None:
+            languages.append(_language_row(user_id, language))
+        db.session.commit()
+
+    counts = summary
+    recent = Vocabulary.query.filter(Vocabulary.user_id == user_id, Vocabulary.created_at >= now - timedelta(days=7))
+    if language is not None:
+        counts = next(row for row in languages if row.language == language)
+        recent = recent.filter(Vocabulary.language == language)
+
+    return {
+        'language': language,
+        'total_words': counts.total_words,
+        'proficiency_distribution': {
+            label: getattr(counts, column) for label, column in zip(PROFICIENCY_BUCKETS, BUCKET_COLUMNS)
+        },
+        'words_by_language': {row.language: row.total_words for row in languages},
+        'recent_words': recent.count(),
+        'total_practice_sessions': summary.total_sessions,
+        'total_words_practiced': summary.total_words_practiced,
+        'current_streak': effective_streak(summary, now.date()),
+        'last_practice': summary.last_practice,
+    }
+
+
+def activity_calendar(user_id, days=ACTIVITY_DAYS, today=None):
+    """Practice activity for the ``days`` days ending ``today``, read from the DailyActivity rollup.
+
+    One range query on the (user_id, day) primary key returns at most ``days``
+    rows; the streaks are computed from them in a single pass. Only days with
+    practice are listed. A current streak that reaches back past the window is
+    taken from the UserStats counter instead.
+    """
+    today = today or utc_today()
+    start = today - timedelta(days=days - 1)
+    columns = [getattr(DailyActivity, column) for column in ACTIVITY_COLUMNS]
+    rows = db.session.query(DailyActivity.day, *columns).filter(
+        DailyActivity.user_id == user_id, DailyActivity.day >= start, DailyActivity.day <= today
+    ).order_by(DailyActivity.day).all()
+    active_days = [row[0] for row in rows]
+
+    longest, latest = streak_runs(active_days)
+    current = 0
+    if active_days and active_days[-1] >= today - timedelta(days=1):
+        current = latest
+        if active_days[-1] - timedelta(days=latest - 1) == start:
+            summary = db.session.get(UserStats, user_id)
+            current = max(current, effective_streak(summary, today) if summary else 0)
+
+    totals = [sum(values) for values in zip(*(row[1:] for row in rows))] or [0] * len(ACTIVITY_COLUMNS)
+    return {
+        'start': start.isoformat(),
+        'end': today.isoformat(),
+        'current_streak': current,
+        'longest_streak': max(longest, current),
+        'active_days': len(active_days),
+        'totals': dict(zip(ACTIVITY_COLUMNS, totals)),
+        'days': [dict(zip(ACTIVITY_COLUMNS, values), date=day.isoformat()) for day, *values in rows],
+    }
+
+
+def rebuild_user_stats(user_id, verify_only=False):
+    """Recompute a user's summary from the raw tables.
+
+    Returns a dict of {column: (stored, actual)} for every column that was out
+    of date (``language.column`` for the per-language counters and
+    ``activity.day.column`` for the daily activity rollup). Unless
+    ``verify_only`` is set the rows are corrected in the session.
+    """
+    language_mismatches = _rebuild_language_rows(user_id, verify_only)
+    language_mismatches.update(_rebuild_activity_rows(user_id, verify_only))
+    values = aggregate_user_statistics(user_id)
+    row = db.session.get(UserStats, user_id)
+    stored = {column: getattr(row, column) if row else None for column in SUMMARY_COLUMNS}
+    mismatches = {column: (stored[column], values[column])
+                  for column in SUMMARY_COLUMNS if stored[column] != values[column]}
+    if mismatches and not verify_only:
+        if row is None:
+            row = UserStats(user_id=user_id)
+            db.session.add(row)
+        for column in SUMMARY_COLUMNS:
+            setattr(row, column, values[column])
+    if (mismatches or language_mismatches) and not verify_only:
+        row.data_version = (row.data_version or 0) + 1
+        row.data_updated_at = datetime.utcnow()
+    mismatches.update(language_mismatches)
+    return mismatches
+
+
+def _rebuild_language_rows(user_id, verify_only):
+    counts = aggregate_language_counts(user_id)
+    rows = {row.language: row for row in UserLanguage.query.filter_by(user_id=user_id)}
+    mismatches = {}
+    for language in sorted(set(counts) | set(rows)):
+        row = rows.get(language)
+        for column in BUCKET_COLUMNS:
+            stored = getattr(row, column) if row else None
+            actual = counts.get(language, {}).get(column, 0)
+            if stored != actual:
+                mismatches[f'{language}.{column}'] = (stored, actual)
+                if not verify_only:
+                    if row is None:
+                        row = rows[language] = UserLanguage(user_id=user_id, language=language)
+                        db.session.add(row)
+                    setattr(row, column, actual)
+    return mismatches
+
+
+def _rebuild_activity_rows(user_id, verify_only):
+    totals = aggregate_daily_activity(user_id)
+    rows = {row.day: row for row in DailyActivity.query.filter_by(user_id=user_id)}
+    mismatches = {}
+    for day in sorted(set(totals) | set(rows)):
+        row = rows.get(day)
+        actual = totals.get(day)
+        changed = False
+        for column in ACTIVITY_COLUMNS:
+            stored = getattr(row, column) if row else None
+            value = actual[column] if actual else None
+            if stored != value:
+                mismatches[f'activity.{day.isoformat()}.{column}'] = (stored, value)
+                changed = True
+        if verify_only or not changed:
+            continue
+        if actual is None:
+            db.session.delete(row)
+        elif row is None:
+            db.session.add(DailyActivity(user_id=user_id, day=day, **actual))
+        else:
+            for column in ACTIVITY_COLUMNS:
+                setattr(row, column, actual[column])
+    return mismatches
+
+
+def get_user_statistics(user_id, ttl=None, language=None):
+    """Return memoized statistics for a user (and language), recomputing after writes or ``ttl`` seconds.
+
+    Entries are checked against the user's data version, so a write made by
+    another worker process is never served from this process's memo.
+    """
+    ttl = CACHE_TTL if ttl is None else ttl
+    version = db.session.query(UserStats.data_version).filter(UserStats.user_id == user_id).scalar()
+    with _cache_lock:
+        entry = _cache.get(user_id, {}).get(language)
+    if entry and entry[1] == version and time.monotonic() - entry[0] < ttl:
+        return entry[2]
+
+    stats = compute_user_statistics(user_id, language=language)
+    with _cache_lock:
+        _cache.setdefault(user_id, {})[language] = (time.monotonic(), version, stats)
+    return stats
+
+
+def invalidate_user_statistics(user_id):
+    """Drop the memoized statistics after the user's vocabulary or practice data changes"""
+    with _cache_lock:
+        _cache.pop(user_id, None)
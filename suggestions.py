@@ -0,0 +1,107 @@
+import hashlib
+import random
+from collections import defaultdict
+
+from sqlalchemy import insert, tuple_
+
+from models import db, User, Vocabulary, DailySuggestion
+
+DAILY_WORD_COUNT = 5
+
+
+def suggestion_rng(user_id, day, language):
+    """Random generator seeded by (user, day, language): regenerating a day picks the same words"""
+    digest = hashlib.sha256(f'{user_id}:{day.isoformat()}:{language}'.encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], 'big'))
+
+
+def pick_suggestions(catalog, user_id, language, known_words, day, count=DAILY_WORD_COUNT):
+    """Suggestion rows for one user and day, as dicts ready for a bulk INSERT"""
+    entries = catalog.sample(language, count, exclude=known_words, rng=suggestion_rng(user_id, day, language))
+    return [{'user_id': user_id, 'language': language, 'word': entry.word, 'translation': entry.translation,
+             'date': day, 'practiced': False} for entry in entries]
+
+
+def _insert_ignoring_duplicates():
+    """INSERT that skips rows already covered by the (user_id, language, date, word) unique index"""
+    # Dialect modules are imported here; loading the PostgreSQL one costs ~60 ms at startup
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(DailySuggestion).on_conflict_do_nothing()
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+        return postgresql_insert(DailySuggestion).on_conflict_do_nothing()
+    return insert(DailySuggestion)
+
+
+def insert_suggestions(rows):
+    if rows:
+        db.session.execute(_insert_ignoring_duplicates(), rows)
+
+
+def user_language(user, catalog, default_language):
+    return user.target_language if user.target_language in catalog else default_language
+
+
+def ensure_user_suggestions(user, day, catalog, default_language):
+    """Today's suggestions for one user in their active language, generating them if the batch job has not.
+
+    Generation is idempotent: the seed depends only on (user, day, language)
+    and rows that already exist are skipped, so two concurrent first requests
+    insert the same words once instead of doubling the list. Only words the
+    user knows in that language are excluded.
+    """
+    language = user_language(user, catalog, default_language)
+    suggestions = DailySuggestion.query.filter_by(user_id=user.id, language=language, date=day).all()
+    if suggestions:
+        return suggestions
+
+    known_words = {w for (w,) in db.session.query(Vocabulary.word).filter(
+        Vocabulary.user_id == user.id, Vocabulary.language == language)}
+    insert_suggestions(pick_suggestions(catalog, user.id, language, known_words, day))
+    db.session.commit()
+    return DailySuggestion.query.filter_by(user_id=user.id, language=language, date=day).all()
+
+
+def generate_daily_batch(catalog, day, default_language, chunk_size=1000, progress=None):
+    """Generate ``day``'s suggestions in each user's active language for every user who does not have them yet.
+
+    Users are walked in primary-key chunks; each chunk costs one query for
+    the users, one for who is already done, one for their known words and
+    one bulk INSERT, then commits. Re-running (or resuming after a crash)
+    only fills in the users still missing. Returns (users generated, rows inserted).
+    """
+    users_done = 0
+    rows_inserted = 0
+    last_id = 0
+    while True:
+        users = db.session.query(User.id, User.target_language).filter(
+            User.id > last_id).order_by(User.id).limit(chunk_size).all()
+        if not users:
+            break
+        last_id = users[-1].id
+        user_ids = [user.id for user in users]
+
+        languages = {user.id: user_language(user, catalog, default_language) for user in users}
+        already = set(db.session.query(DailySuggestion.user_id, DailySuggestion.language).filter(
+            DailySuggestion.user_id.in_(user_ids), DailySuggestion.date == day).distinct())
+        pending = [user for user in users if (user.id, languages[user.id]) not in already]
+        if pending:
+            known_words = defaultdict(set)
+            for user_id, word in db.session.query(Vocabulary.user_id, Vocabulary.word).filter(
+                    tuple_(Vocabulary.user_id, Vocabulary.language).in_(
+                        [(user.id, languages[user.id]) for user in pending])):
+                known_words[user_id].add(word)
+
+            rows = []
+            for user in pending:
+                rows.extend(pick_suggestions(catalog, user.id, languages[user.id], known_words[user.id], day))
+            insert_suggestions(rows)
+            db.session.commit()
+            users_done += len(pending)
+            rows_inserted += len(rows)
+
+        if progress:
+            progress(users_done)
+    return users_done, rows_inserted
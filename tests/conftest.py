@@ -0,0 +1,43 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+_instance = tempfile.mkdtemp()
+os.environ.update(DATABASE_URL=f'sqlite:///{os.path.join(_instance, "test.db")}', TTS_BACKEND='stub',
+                  AUDIO_MODE='browser', AUDIO_CACHE_DIR=os.path.join(_instance, 'audio'),
+                  WORD_CATALOG_DIR=os.path.join(_instance, 'catalog'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+from models import db  # noqa: E402
+from stats import _cache as stats_cache  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    app_module.app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    with app_module.app.app_context():
+        db.drop_all()
+        db.create_all()
+    app_module.user_profiles.clear()
+    app_module.http_cache.fragments.clear()
+    stats_cache.clear()
+    yield app_module.app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def sign_up(client, name='alice', language='Spanish'):
+    """Register and log in a user; returns their id"""
+    client.post('/register', data={'username': name, 'email': f'{name}@example.com', 'native_language': 'English',
+                                   'target_language': language, 'password': 'secret', 'confirm_password': 'secret'})
+    client.post('/login', data={'email': f'{name}@example.com', 'password': 'secret'})
+    client.get('/')  # consume the login flash so pages are cacheable
+    from models import User
+    with client.application.app_context():
+        return User.query.filter_by(username=name).one().id
@@ -0,0 +1,60 @@
+import asyncio
+
+import app as app_module
+import asgi
+from conftest import sign_up
+
+
+def asgi_get(path, query=b'', cookie=''):
+    """Send a GET through asgi.application; returns (status, body)"""
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': query, 'http_version': '1.1',
+             'scheme': 'http', 'server': ('testserver', 80), 'headers': [(b'cookie', cookie.encode('latin-1'))]}
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(asgi.application(scope, receive, send))
+    body = b''.join(message.get('body', b'') for message in messages if message['type'] == 'http.response.body')
+    return messages[0]['status'], body
+
+
+def test_speak_miss_runs_the_view_once(app, client, monkeypatch):
+    sign_up(client)
+    cookie = f'session={client.get_cookie("session").value}'
+    calls = []
+    view = app.view_functions['speak_word']
+
+    def counting_view(*args, **kwargs):
+        calls.append(kwargs['word'])
+        return view(*args, **kwargs)
+
+    monkeypatch.setitem(app.view_functions, 'speak_word', counting_view)
+    monkeypatch.setattr(app_module.tts_backend, 'latency', 0.05)
+
+    status, body = asgi_get('/speak/gato', b'lang=es', cookie)
+    assert status == 200 and body
+    assert calls == ['gato']  # the synthesis was awaited before the view, not replayed after it
+    assert app_module.audio_cache.get('es', 'gato')
+
+
+def test_other_routes_use_the_wsgi_adapter(app, client):
+    status, body = asgi_get('/login')
+    assert status == 200 and b'<form' in body
+    assert asgi_get('/speak/perro')[0] == 302  # anonymous: the view's login redirect, nothing synthesized
+    assert app_module.audio_cache.get(app_module.lang_code_for('Spanish'), 'perro') is None
+
+
+def test_speak_counts_each_cache_lookup_once(app, client):
+    sign_up(client)
+    cookie = f'session={client.get_cookie("session").value}'
+    cache = app_module.audio_cache
+    hits, misses = cache.hits, cache.misses
+
+    assert asgi_get('/speak/raton', b'lang=es', cookie)[0] == 200
+    assert (cache.hits - hits, cache.misses - misses) == (0, 1)
+    assert asgi_get('/speak/raton', b'lang=es', cookie)[0] == 200
+    assert (cache.hits - hits, cache.misses - misses) == (1, 1)
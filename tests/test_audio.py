@@ -0,0 +1,31 @@
+from audio_cache import AudioCache
+from conftest import sign_up
+
+
+def test_speak_urls_are_per_language(app, client):
+    sign_up(client)
+    page = client.get('/pronunciation').get_data(as_text=True)
+    assert '?lang=es' in page
+
+    spanish = client.get('/speak/casa?lang=es')
+    italian = client.get('/speak/casa?lang=it')
+    assert spanish.status_code == italian.status_code == 200
+    assert spanish.headers['ETag'] != italian.headers['ETag']
+    assert 'max-age=' in spanish.headers['Cache-Control'] and 'private' in spanish.headers['Cache-Control']
+
+
+def test_speak_without_language_is_revalidated(app, client):
+    sign_up(client)
+    response = client.get('/speak/casa')
+    assert response.status_code == 200
+    assert 'no-cache' in response.headers['Cache-Control']
+
+
+def test_overwriting_an_entry_keeps_the_size_exact(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=1000)
+    cache.put('es', 'casa', b'x' * 100)
+    for _ in range(20):
+        cache.put('es', 'casa', b'y' * 300)
+    assert cache.stats()['size_bytes'] == 300
+    assert cache.evictions == 0
+    assert cache.get('es', 'casa')
@@ -0,0 +1,18 @@
+from catalog import MappedLanguageIndex, write_catalog_file
+from search import SearchIndex
+
+WORDS = [('casa', 'house'), ('cansado', 'tired'), ('casado', 'married'), ('cosa', 'thing'),
+         ('niño', 'child'), ('año', 'year'), ('mañana', 'tomorrow'), ('perro', 'dog'), ('pero', 'but')]
+
+
+def test_catalog_file_search_matches_in_memory_index(tmp_path):
+    path = str(tmp_path / 'spanish.wcat')
+    write_catalog_file(path, WORDS)
+    catalog = MappedLanguageIndex(path)
+    mapped = catalog.search_index()
+    in_memory = SearchIndex(WORDS)
+
+    assert len(mapped) == len(in_memory)
+    for query in ['cas', 'casa', 'csa', 'nino', 'ano', 'manan', 'pero', 'perrro', 'xyz', '']:
+        assert sorted(mapped.search(query, 20)) == sorted(in_memory.search(query, 20)), query
+    catalog.close()
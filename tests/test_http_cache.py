@@ -0,0 +1,26 @@
+from datetime import datetime, timedelta
+
+import models
+from models import DailySuggestion
+
+from conftest import sign_up
+
+
+def test_etag_and_suggestions_change_together_at_midnight(app, client, monkeypatch):
+    user_id = sign_up(client)
+    first = client.get('/daily-words')
+    assert first.status_code == 200 and first.headers['ETag']
+    assert client.get('/daily-words', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    class Tomorrow(datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime.utcnow() + timedelta(days=1)
+
+    monkeypatch.setattr(models, 'datetime', Tomorrow)
+    second = client.get('/daily-words', headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+    with app.app_context():
+        days = {row.date for row in DailySuggestion.query.filter_by(user_id=user_id)}
+    assert days == {models.today() - timedelta(days=1), models.today()}
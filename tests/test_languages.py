@@ -0,0 +1,73 @@
+from sqlalchemy import event, text
+
+from app import load_user
+from models import db, Vocabulary
+
+from conftest import sign_up
+
+
+def switch_language_elsewhere(app, user_id, language):
+    """Change the language as another worker would: no ORM events reach this process's caches"""
+    with app.app_context():
+        db.session.execute(text('UPDATE user SET target_language = :language WHERE id = :id'),
+                           {'language': language, 'id': user_id})
+        db.session.commit()
+
+
+def test_language_switched_by_another_worker_applies_after_an_etag_check(app, client):
+    user_id = sign_up(client)
+    first = client.get('/api/vocabulary')
+    assert first.status_code == 200
+
+    switch_language_elsewhere(app, user_id, 'French')
+    revalidated = client.get('/api/vocabulary', headers={'If-None-Match': first.headers['ETag']})
+    assert revalidated.status_code == 200 and revalidated.json['items'] == []
+
+    # The lookup dropped this worker's stale profile, so uncached routes use French too
+    client.post('/vocabulary', data={'word': 'chat', 'translation': 'cat', 'proficiency': 0})
+    with app.app_context():
+        assert Vocabulary.query.filter_by(user_id=user_id, word='chat').one().language == 'French'
+
+
+def test_study_language_switch(app, client):
+    user_id = sign_up(client)
+    response = client.post('/languages', data={'language': 'Italian'})
+    assert response.status_code == 302
+    client.get('/')
+    assert client.get('/statistics').status_code == 200
+    with app.app_context():
+        assert db.session.execute(text('SELECT target_language FROM user WHERE id = :id'),
+                                  {'id': user_id}).scalar() == 'Italian'
+
+
+def test_language_switch_invalidates_the_cached_profile(app, client):
+    user_id = sign_up(client)
+    client.get('/vocabulary')
+    with app.app_context():
+        assert load_user(str(user_id)).target_language == 'Spanish'
+
+    client.post('/languages', data={'language': 'German'})
+    with app.app_context():
+        assert load_user(str(user_id)).target_language == 'German'
+
+
+def test_search_with_a_warm_profile_cache_does_not_load_the_user(app, client):
+    sign_up(client)
+    client.post('/vocabulary', data={'word': 'gato', 'translation': 'cat', 'proficiency': 0})
+    client.post('/api/search-word', json={'word': 'gat'})
+
+    statements = []
+
+    def record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.post('/api/search-word', json={'word': 'gat'})
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    assert response.status_code == 200
+    assert not any('target_language' in statement for statement in statements), statements
+    assert len(statements) == 2, statements
@@ -0,0 +1,88 @@
+import logging
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+from metrics import MetricsRegistry, RequestMetrics
+
+from conftest import sign_up
+
+
+def test_render_uses_the_prometheus_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter('requests_total', 'Requests', ('route',))
+    latency = registry.histogram('latency_seconds', 'Latency', ('route',), buckets=(0.1, 1.0))
+    registry.callback('queue_length', 'Jobs waiting', lambda: 3)
+
+    requests.inc('/a "quoted"\\path')
+    requests.inc('/b', amount=2)
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, '/a')
+
+    assert registry.render().splitlines() == [
+        '# HELP requests_total Requests',
+        '# TYPE requests_total counter',
+        'requests_total{route="/a \\"quoted\\"\\\\path"} 1',
+        'requests_total{route="/b"} 2',
+        '# HELP latency_seconds Latency',
+        '# TYPE latency_seconds histogram',
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1.0"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 5.55',
+        'latency_seconds_count{route="/a"} 3',
+        '# HELP queue_length Jobs waiting',
+        '# TYPE queue_length gauge',
+        'queue_length 3',
+    ]
+
+
+@pytest.fixture
+def instrumented():
+    app = Flask(__name__)
+    engine = create_engine('sqlite://')
+    registry = MetricsRegistry()
+    request_metrics = RequestMetrics(registry, slow_request_ms=0.000001)
+
+    @app.route('/items/<int:item_id>')
+    def item(item_id):
+        with engine.connect() as connection:
+            for _ in range(6):
+                connection.execute(text('SELECT 1'))
+        return 'ok'
+
+    @app.route('/broken')
+    def broken():
+        raise RuntimeError('boom')
+
+    request_metrics.init_app(app, engine)
+    return app, registry
+
+
+def test_requests_are_labelled_by_route_rule_with_sql_counts(instrumented, caplog):
+    app, registry = instrumented
+    client = app.test_client()
+    with caplog.at_level(logging.WARNING):
+        for item_id in (1, 2):
+            assert client.get(f'/items/{item_id}').status_code == 200
+    assert client.get('/broken').status_code == 500
+
+    rendered = registry.render()
+    assert 'http_requests_total{method="GET",route="/items/<int:item_id>",status="200"} 2' in rendered
+    assert 'http_requests_total{method="GET",route="/broken",status="500"} 1' in rendered
+    assert 'http_request_sql_queries_bucket{route="/items/<int:item_id>",le="5.0"} 0' in rendered
+    assert 'http_request_sql_queries_bucket{route="/items/<int:item_id>",le="10.0"} 2' in rendered
+    assert 'http_request_sql_queries_count{route="/items/<int:item_id>"} 2' in rendered
+    assert 'repeated 6x (possible N+1): SELECT 1' in caplog.text
+
+
+def test_metrics_endpoint(app, client):
+    sign_up(client)
+    client.get('/vocabulary')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    body = response.get_data(as_text=True)
+    assert 'http_requests_total{method="GET",route="/vocabulary",status="200"}' in body
+    assert '# TYPE audio_cache_hit_ratio gauge' in body
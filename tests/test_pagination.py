@@ -0,0 +1,78 @@
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import db, Vocabulary
+from pagination import InvalidCursor, decode_cursor, encode_cursor, paginate_vocabulary
+
+from conftest import sign_up
+
+CREATED = datetime(2026, 3, 1, 12, 0, 0, 123456)
+
+
+def all_pages(user_id, **options):
+    pages, cursor = [], None
+    while True:
+        items, cursor = paginate_vocabulary(user_id, 'Spanish', cursor=cursor, **options)
+        pages.append([vocab.word for vocab in items])
+        if cursor is None:
+            return pages
+
+
+def add_words(user_id, words):
+    for word, created_at, proficiency in words:
+        db.session.add(Vocabulary(user_id=user_id, word=word, translation=word.upper(), language='Spanish',
+                                  created_at=created_at, proficiency=proficiency))
+    db.session.commit()
+
+
+def test_cursor_round_trip(app, client):
+    user_id = sign_up(client)
+    with app.app_context():
+        add_words(user_id, [('gato', CREATED, 0)])
+        vocab = Vocabulary.query.one()
+        assert decode_cursor(encode_cursor(vocab)) == (CREATED, vocab.id)
+    assert decode_cursor(None) is None and decode_cursor('') is None
+
+
+def test_pages_do_not_overlap_on_tied_timestamps(app, client):
+    user_id = sign_up(client)
+    words = [f'word{number}' for number in range(7)]
+    with app.app_context():
+        add_words(user_id, [(word, CREATED, 0) for word in words] + [('older', CREATED - timedelta(days=1), 0)])
+        pages = all_pages(user_id, limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 2]
+    flat = [word for page in pages for word in page]
+    assert len(flat) == len(set(flat)) == 8
+    assert flat == list(reversed(words)) + ['older']  # ties broken by id, newest first
+
+
+def test_filters_apply_on_every_page(app, client):
+    user_id = sign_up(client)
+    with app.app_context():
+        add_words(user_id, [(f'ga{number}', CREATED - timedelta(minutes=number), number % 2 * 3)
+                            for number in range(10)] + [('perro', CREATED, 0)])
+        pages = all_pages(user_id, limit=2, prefix='GA', proficiency='beginner')
+
+    assert [word for page in pages for word in page] == ['ga0', 'ga2', 'ga4', 'ga6', 'ga8']
+    assert len(pages) == 3
+
+
+def b64(raw):
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+TAMPERED = ['not a cursor!', 'Zm9v', b64('yesterday|1'), b64(f'{CREATED.isoformat()}|x'),
+            b64(f'{CREATED.isoformat()}|{10 ** 30}'), b64(f'{CREATED.isoformat()}+02:00|5'), '%ff%fe']
+
+
+@pytest.mark.parametrize('cursor', TAMPERED)
+def test_tampered_cursor_is_rejected(app, client, cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+    sign_up(client)
+    assert client.get('/api/vocabulary', query_string={'cursor': cursor}).status_code == 400
+    assert client.get('/vocabulary', query_string={'cursor': cursor}).status_code == 400
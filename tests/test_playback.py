@@ -0,0 +1,106 @@
+import queue
+import threading
+import time
+
+import pytest
+
+import app as app_module
+import playback
+from playback import LazyPlayback, PlaybackQueue
+
+from conftest import sign_up
+
+
+class FakePlayer:
+    """Stands in for play_audio: records files, blocks until released, fails files named 'broken'"""
+
+    def __init__(self):
+        self.played = []
+        self.release = threading.Semaphore(0)
+
+    def __call__(self, player, filename):
+        self.release.acquire(timeout=5)
+        if filename == 'broken':
+            raise RuntimeError('device busy')
+        self.played.append(filename)
+        return True
+
+
+@pytest.fixture
+def fake_player(monkeypatch):
+    fake = FakePlayer()
+    monkeypatch.setattr(playback, 'play_audio', fake)
+    return fake
+
+
+def wait_for(check, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not check():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def test_jobs_play_one_at_a_time_in_order(fake_player):
+    finished = []
+    playback_queue = PlaybackQueue('fake', on_played=lambda seconds, status: finished.append(status)).start()
+    first = playback_queue.enqueue('a.mp3', label='a')
+    second = playback_queue.enqueue('b.mp3', label='b')
+
+    wait_for(lambda: playback_queue.status(first)['status'] == 'playing')
+    assert playback_queue.status(second)['status'] == 'queued'
+
+    fake_player.release.release()
+    fake_player.release.release()
+    wait_for(lambda: playback_queue.status(second)['status'] == 'done')
+    assert fake_player.played == ['a.mp3', 'b.mp3']
+    assert finished == ['done', 'done']
+    assert playback_queue.status(first)['finished_at'] and playback_queue.pending == 0
+
+
+def test_failed_playback_is_reported(fake_player):
+    playback_queue = PlaybackQueue('fake').start()
+    job_id = playback_queue.enqueue('broken')
+    fake_player.release.release()
+    wait_for(lambda: playback_queue.status(job_id)['status'] == 'failed')
+    assert playback_queue.status(job_id)['error'] == 'device busy'
+
+
+def test_full_queue_rejects_new_jobs():
+    playback_queue = PlaybackQueue('fake', maxsize=2)  # not started: nothing drains it
+    playback_queue.enqueue('a.mp3')
+    playback_queue.enqueue('b.mp3')
+    with pytest.raises(queue.Full):
+        playback_queue.enqueue('c.mp3')
+    assert playback_queue.pending == 2
+
+
+def test_job_history_is_bounded():
+    playback_queue = PlaybackQueue('fake', maxsize=10, history=2)
+    job_ids = [playback_queue.enqueue(f'{number}.mp3') for number in range(3)]
+    assert playback_queue.status(job_ids[0]) is None
+    assert [playback_queue.status(job_id)['status'] for job_id in job_ids[1:]] == ['queued', 'queued']
+
+
+def test_lazy_playback_probes_once_on_first_use():
+    probes = []
+    lazy = LazyPlayback(detect=lambda: probes.append(1) or 'fake')
+    assert lazy.pending == 0 and not lazy.resolved and probes == []  # metrics scrapes do not probe
+    assert lazy.get() is lazy.get()
+    assert lazy.player == 'fake' and probes == [1]
+
+    assert LazyPlayback(enabled=False, detect=lambda: probes.append(1) or 'fake').get() is None
+    assert LazyPlayback(detect=lambda: None).get() is None
+    assert probes == [1]
+
+
+def test_speak_queues_server_playback(app, client, fake_player, monkeypatch):
+    sign_up(client)
+    monkeypatch.setitem(app.config, 'AUDIO_MODE', 'server')
+    monkeypatch.setattr(app_module, 'playback', LazyPlayback(player='fake'))
+
+    response = client.get('/speak/gato?lang=es')
+    assert response.status_code == 200 and response.json['success']
+    status_url = response.json['status_url']
+    fake_player.release.release()
+    wait_for(lambda: client.get(status_url).json['status'] == 'done')
+    assert client.get('/playback/999999').status_code == 404
@@ -0,0 +1,45 @@
+import pytest
+
+from conftest import sign_up
+
+
+@pytest.mark.parametrize('body', [
+    {'results': [{'word': 'hola', 'correct': True}], 'duration': 'nan'},
+    {'results': [{'word': 'hola', 'correct': True}], 'duration': 'inf'},
+    {'results': [{'word': 42, 'correct': True}]},
+    {'results': [{'word': ['hola'], 'correct': True}]},
+    {'results': 'hola'},
+    {'results': [{'word': 'hola', 'correct': 'false'}]},
+    {'results': [{'word': 'hola', 'correct': 1}]},
+])
+def test_practice_results_rejects_invalid_input(app, client, body):
+    sign_up(client)
+    assert client.post('/practice-results', json=body).status_code == 400
+
+
+def test_practice_results_rejects_json_nan(app, client):
+    sign_up(client)
+    response = client.post('/practice-results', data='{"results": [{"word": "hola"}], "duration": NaN}',
+                           content_type='application/json')
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('body', [{'word': 7}, {}, None, {'word': 'hola', 'correct': 'false'},
+                                  {'word': 'hola', 'correct': None}])
+def test_practice_result_requires_a_word(app, client, body):
+    sign_up(client)
+    assert client.post('/practice-result', json=body).status_code == 400
+
+
+@pytest.mark.parametrize('body', [{'word': 'hola', 'limit': 'many'}, {'word': 'hola', 'limit': [1]},
+                                  {'word': 'hola', 'limit': 1e400}, {'word': 5}])
+def test_search_word_rejects_invalid_input(app, client, body):
+    sign_up(client)
+    assert client.post('/api/search-word', json=body).status_code == 400
+
+
+def test_valid_session_is_recorded(app, client):
+    sign_up(client)
+    response = client.post('/practice-results', json={'results': [{'word': 'hola', 'correct': True}],
+                                                      'duration': '12.5'})
+    assert response.status_code == 200 and response.json['recorded'] == 1
@@ -0,0 +1,55 @@
+import re
+
+from sqlalchemy import event
+
+from migrations import check_query_plans
+from models import db
+
+from conftest import sign_up
+
+PER_USER_TABLES = ('vocabulary', 'practice_session', 'daily_suggestion')
+FULL_SCAN = re.compile(r'^SCAN (%s)\b' % '|'.join(PER_USER_TABLES))
+
+
+def scans(plan):
+    return [line for line in plan if FULL_SCAN.match(line)]
+
+
+def test_hot_queries_use_indexes(app):
+    with app.app_context():
+        results = check_query_plans()
+    assert results
+    assert {description: scans(plan) for description, plan, _ok in results if scans(plan)} == {}
+
+
+def test_queries_issued_by_routes_use_indexes(app, client):
+    """Explains the statements the routes actually run, not just the hand-written hot_queries() list"""
+    sign_up(client)
+    for word in ('gato', 'perro', 'casa'):
+        client.post('/vocabulary', data={'word': word, 'translation': word.upper(), 'proficiency': 1})
+
+    statements = []
+
+    def record(_conn, _cursor, statement, parameters, _context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and not executemany:
+            statements.append((statement, parameters))
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        for path in ('/vocabulary', '/vocabulary?proficiency=beginner', '/api/vocabulary', '/daily-words',
+                     '/pronunciation', '/statistics', '/api/activity'):
+            assert client.get(path).status_code == 200, path
+        client.post('/practice-result', json={'word': 'gato', 'correct': True})
+        client.post('/api/search-word', json={'word': 'gat'})
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+    full_scans = {}
+    with engine.connect() as connection:
+        for statement, parameters in statements:
+            plan = [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+            if scans(plan):
+                full_scans[statement] = plan
+    assert statements and full_scans == {}
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import db, Vocabulary
+from srs import (QUALITY_CORRECT, QUALITY_INCORRECT, CardState, SchedulerParams, due_words, reschedule_all,
+                 schedule)
+
+from conftest import sign_up
+
+NOW = datetime(2026, 3, 1, 12, 0)
+NEW_CARD = CardState(2.5, 0.0, 0, NOW)
+
+
+def review(qualities, state=NEW_CARD, params=SchedulerParams()):
+    states = []
+    for quality in qualities:
+        state = schedule(state, quality, NOW, params)
+        states.append(state)
+    return states
+
+
+def test_correct_reviews_grow_the_interval():
+    states = review([QUALITY_CORRECT] * 4)
+    assert [state.repetitions for state in states] == [1, 2, 3, 4]
+    assert [state.interval_days for state in states] == [1.0, 6.0, 15.0, 37.5]
+    assert all(state.ease_factor == pytest.approx(2.5) for state in states)  # quality 4 keeps the ease
+    assert states[-1].due_at == NOW + timedelta(days=37.5)
+
+
+def test_failed_recall_resets_the_streak_and_lowers_the_ease():
+    *_, learned, lapsed = review([QUALITY_CORRECT] * 3 + [QUALITY_INCORRECT])
+    assert learned.interval_days == 15.0
+    assert (lapsed.repetitions, lapsed.interval_days) == (0, 1.0)
+    assert lapsed.ease_factor == pytest.approx(2.18)
+    assert lapsed.due_at == NOW + timedelta(days=1)
+
+    relearned = schedule(lapsed, QUALITY_CORRECT, NOW)
+    assert (relearned.repetitions, relearned.interval_days) == (1, 1.0)
+
+
+def test_ease_never_drops_below_the_floor():
+    states = review([0] * 10)
+    assert min(state.ease_factor for state in states) == pytest.approx(1.3)
+    assert states[-1].ease_factor == pytest.approx(1.3)
+
+
+def test_interval_is_capped():
+    params = SchedulerParams(max_interval=30.0)
+    states = review([5] * 6, params=params)
+    assert states[-1].interval_days == 30.0
+
+
+def test_unset_ease_starts_from_the_initial_ease():
+    state = schedule(CardState(None, None, None, NOW), QUALITY_CORRECT, NOW)
+    assert state.ease_factor == pytest.approx(2.5) and state.repetitions == 1
+
+
+def add_words(user_id, words):
+    for word, language, due_at in words:
+        db.session.add(Vocabulary(user_id=user_id, word=word, translation=word.upper(), language=language,
+                                  due_at=due_at))
+    db.session.commit()
+
+
+def test_due_words_are_most_overdue_first(app, client):
+    user_id = sign_up(client)
+    other_id = sign_up(app.test_client(), 'bob')
+    with app.app_context():
+        add_words(user_id, [('gato', 'Spanish', NOW - timedelta(days=1)),
+                            ('perro', 'Spanish', NOW - timedelta(days=5)),
+                            ('casa', 'Spanish', NOW - timedelta(hours=1)),
+                            ('mesa', 'Spanish', NOW + timedelta(days=1)),
+                            ('chat', 'French', NOW - timedelta(days=9))])
+        add_words(other_id, [('libro', 'Spanish', NOW - timedelta(days=9))])
+
+        assert [v.word for v in due_words(user_id, 'Spanish', now=NOW)] == ['perro', 'gato', 'casa']
+        assert [v.word for v in due_words(user_id, 'Spanish', limit=2, now=NOW)] == ['perro', 'gato']
+        assert [v.word for v in due_words(user_id, 'French', now=NOW)] == ['chat']
+
+
+def test_reschedule_all_applies_new_parameters(app, client):
+    user_id = sign_up(client)
+    with app.app_context():
+        db.session.add_all([
+            Vocabulary(user_id=user_id, word='gato', translation='cat', language='Spanish', ease_factor=2.5,
+                       repetitions=3, interval_days=15, last_reviewed=NOW, due_at=NOW + timedelta(days=15)),
+            Vocabulary(user_id=user_id, word='perro', translation='dog', language='Spanish', repetitions=0,
+                       last_reviewed=NOW, due_at=NOW + timedelta(days=1)),
+        ])
+        db.session.commit()
+
+        assert reschedule_all(SchedulerParams(second_interval=4.0), chunk_size=1) == 1
+        gato, perro = (Vocabulary.query.filter_by(word=word).one() for word in ('gato', 'perro'))
+        assert (gato.interval_days, gato.due_at) == (10.0, NOW + timedelta(days=10))
+        assert perro.due_at == NOW + timedelta(days=1)  # not in a correct streak: untouched
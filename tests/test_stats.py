@@ -0,0 +1,69 @@
+from datetime import date
+
+import pytest
+
+import stats
+from models import db, DailyActivity, UserStats
+from practice import record_practice_results
+from stats import get_user_statistics, rebuild_user_stats, record_activity
+
+from conftest import sign_up
+
+
+def add_word(client, word, proficiency=0):
+    client.post('/vocabulary', data={'word': word, 'translation': word.upper(), 'proficiency': proficiency})
+
+
+def test_first_session_without_summary_row_keeps_counters_exact(app, client):
+    user_id = sign_up(client)
+    add_word(client, 'hola', proficiency=2)
+    add_word(client, 'gato')
+    with app.app_context():
+        # As after upgrade-db: the user has data but no UserStats row yet
+        UserStats.query.filter_by(user_id=user_id).delete()
+        db.session.commit()
+
+    response = client.post('/practice-results', json={
+        'results': [{'word': 'hola', 'correct': True}, {'word': 'gato', 'correct': False}], 'duration': 30})
+    assert response.status_code == 200
+
+    with app.app_context():
+        assert rebuild_user_stats(user_id, verify_only=True) == {}
+        assert db.session.get(UserStats, user_id).total_sessions == 1
+
+
+def test_practice_keeps_counters_exact(app, client):
+    user_id = sign_up(client)
+    add_word(client, 'hola', proficiency=2)
+    for correct in (True, True, False):
+        client.post('/practice-result', json={'word': 'hola', 'correct': correct})
+
+    with app.app_context():
+        assert rebuild_user_stats(user_id, verify_only=True) == {}
+
+
+def test_statistics_memo_sees_writes_from_other_workers(app, client):
+    user_id = sign_up(client)
+    add_word(client, 'hola')
+    with app.app_context():
+        assert get_user_statistics(user_id, language='Spanish')['total_practice_sessions'] == 0
+        # Another worker records practice: this process's memo is not invalidated explicitly
+        record_practice_results(user_id, 'Spanish', [('hola', True)])
+        assert get_user_statistics(user_id, language='Spanish')['total_practice_sessions'] == 1
+
+
+@pytest.mark.parametrize('upsert', [True, False], ids=['upsert', 'fallback'])
+def test_record_activity_adds_to_the_day_row(app, client, monkeypatch, upsert):
+    user_id = sign_up(client)
+    if not upsert:
+        monkeypatch.setattr(stats, '_upsert_activity', lambda: None)
+    day = date(2026, 3, 1)
+    with app.app_context():
+        record_activity(user_id, day, words_practiced=3, session_duration=20)
+        db.session.commit()
+        # A row committed by another request in between is added to, not inserted again
+        record_activity(user_id, day, words_practiced=2, correct_pronunciations=1)
+        db.session.commit()
+        row = db.session.get(DailyActivity, (user_id, day))
+        assert (row.sessions, row.words_practiced, row.correct_pronunciations, row.session_duration) == (2, 5, 1, 20)
+
@@ -0,0 +1,28 @@
+import io
+
+from models import UserLanguage, Vocabulary
+
+from conftest import sign_up
+
+
+def upload(client, text, filename='words.csv'):
+    return client.post('/vocabulary/import', data={'file': (io.BytesIO(text), filename), 'format': 'auto'},
+                       content_type='multipart/form-data', follow_redirects=True)
+
+
+def test_import_rejects_languages_that_cannot_be_studied(app, client):
+    user_id = sign_up(client)
+    response = upload(client, b'word,translation,language\nhola,hello,spanish\nchat,cat,French\nxyz,abc,Klingon\n')
+    assert b'Imported 2 word(s)' in response.data and b'1 invalid' in response.data
+
+    with app.app_context():
+        assert sorted((v.word, v.language) for v in Vocabulary.query.filter_by(user_id=user_id)) == [
+            ('chat', 'French'), ('hola', 'Spanish')]
+        assert sorted(row.language for row in UserLanguage.query.filter_by(user_id=user_id)) == ['French', 'Spanish']
+
+
+def test_unreadable_import_reports_words_already_imported(app, client):
+    sign_up(client)
+    rows = b''.join(b'word%d,translation\n' % number for number in range(1500))
+    response = upload(client, b'word,translation\n' + rows + b'\xff\xfe broken\n')
+    assert b'1000 word(s) from before the error were imported' in response.data
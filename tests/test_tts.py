@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import TimeoutError
+
+import pytest
+
+from audio_cache import AudioCache
+from tts import StubBackend, TTSDispatcher
+
+
+class GatedBackend(StubBackend):
+    """Stub backend that counts calls, blocks until ``gate`` is set and can fail on demand"""
+
+    def __init__(self, timeout=5.0, failures=0):
+        super().__init__(timeout=timeout)
+        self.gate = threading.Event()
+        self.calls = 0
+        self.failures = failures
+        self._lock = threading.Lock()
+
+    def synthesize(self, text, lang_code, slow=False):
+        with self._lock:
+            self.calls += 1
+            fail = self.failures > 0
+            self.failures -= fail
+        self.gate.wait(10)
+        if fail:
+            raise RuntimeError('upstream TTS error')
+        return super().synthesize(text, lang_code, slow)
+
+
+def dispatcher_for(tmp_path, backend):
+    return TTSDispatcher(backend, AudioCache(str(tmp_path)))
+
+
+def test_concurrent_requests_for_one_word_share_a_synthesis(tmp_path):
+    backend = GatedBackend()
+    dispatcher = dispatcher_for(tmp_path, backend)
+    clients = 8
+    barrier = threading.Barrier(clients)
+    paths = []
+
+    def request():
+        barrier.wait()
+        paths.append(dispatcher.get_audio('hola', 'es'))
+
+    threads = [threading.Thread(target=request) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    while dispatcher.stats()['coalesced'] < clients - 1:
+        threading.Event().wait(0.01)
+    backend.gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert backend.calls == 1
+    assert len(set(paths)) == 1 and len(paths) == clients
+
+
+def test_timeout_leaves_the_synthesis_running_for_the_next_request(tmp_path):
+    backend = GatedBackend(timeout=0.05)
+    dispatcher = dispatcher_for(tmp_path, backend)
+    with pytest.raises(TimeoutError):
+        dispatcher.get_audio('hola', 'es')
+
+    backend.gate.set()
+    path = dispatcher.submit('hola', 'es').result(timeout=5)
+    assert dispatcher.get_audio('hola', 'es') == path
+    assert backend.calls == 1
+
+
+def test_failed_synthesis_is_retried(tmp_path):
+    backend = GatedBackend(failures=1)
+    backend.gate.set()
+    dispatcher = dispatcher_for(tmp_path, backend)
+    with pytest.raises(RuntimeError):
+        dispatcher.get_audio('hola', 'es')
+
+    assert dispatcher.get_audio('hola', 'es')
+    assert backend.calls == 2
+    assert dispatcher.stats()['synthesized'] == 1
@@ -0,0 +1,62 @@
+import app as app_module
+from audio_cache import AudioCache
+from catalog import WordEntry
+from tts import StubBackend, lang_code_for
+from warmup import collect_words, warm_audio_cache
+
+from conftest import sign_up
+
+
+class FakeCatalog:
+    def __init__(self, words):
+        self._words = words
+
+    def languages(self):
+        return list(self._words)
+
+    def words(self, language):
+        return [WordEntry(word, word.upper()) for word in self._words[language]]
+
+
+def test_collect_words_deduplicates_catalog_and_vocabulary():
+    catalog = FakeCatalog({'Spanish': ['hola', 'Hola ', 'gato'], 'French': ['chat']})
+    rows = iter([('Spanish', 'GATO'), ('Spanish', 'perro'), ('Italian', 'gatto'), ('Spanish', '   ')])
+    assert collect_words(catalog, rows, lang_code_for) == [
+        ('es', 'hola'), ('es', 'gato'), ('fr', 'chat'), ('es', 'perro'), ('it', 'gatto')]
+
+
+def test_warmup_skips_cached_words_and_reports_failures(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    backend = StubBackend()
+    cache.put('es', 'hola', backend.synthesize('hola', 'es'))
+    calls = []
+
+    def synthesize(text, lang_code, slow):
+        calls.append(text)
+        if text == 'roto':
+            raise RuntimeError('upstream error')
+        return backend.synthesize(text, lang_code, slow)
+
+    progress = []
+    items = [('es', 'hola'), ('es', 'gato'), ('es', 'roto'), ('fr', 'chat')]
+    report = warm_audio_cache(items, cache, synthesize, workers=2, progress=progress.append, progress_every=1)
+
+    assert (report.skipped, report.generated, report.failed, report.done) == (1, 2, 1, 4)
+    assert report.errors == ['es:roto: upstream error']
+    assert sorted(calls) == ['chat', 'gato', 'roto']
+    assert cache.contains('es', 'gato') and cache.contains('fr', 'chat') and not cache.contains('es', 'roto')
+    assert len(progress) == 3  # once per synthesized word
+
+    # Incremental: a second run only retries what failed
+    calls.clear()
+    again = warm_audio_cache(items, cache, synthesize)
+    assert (again.skipped, again.generated, again.failed) == (3, 0, 1) and calls == ['roto']
+
+
+def test_warm_audio_command(app, client):
+    sign_up(client)
+    client.post('/vocabulary', data={'word': 'murciélago', 'translation': 'bat', 'proficiency': 0})
+    result = app.test_cli_runner().invoke(args=['warm-audio', '--backend', 'stub', '--workers', '2'])
+    assert result.exit_code == 0, result.output
+    assert '🔥 Warming audio cache' in result.output and '0 failed' in result.output
+    assert app_module.audio_cache.contains('es', 'murciélago')
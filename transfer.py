@@ -0,0 +1,209 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from itertools import islice
+from typing import NamedTuple
+
+from sqlalchemy import insert
+
+from forms import TARGET_LANGUAGES
+from models import db, Vocabulary
+from stats import record_words_added
+
+# format name -> (file suffix, mimetype)
+FORMATS = {
+    'csv': ('.csv', 'text/csv'),
+    'jsonl': ('.jsonl', 'application/x-ndjson'),
+    'anki': ('.txt', 'text/tab-separated-values'),
+}
+EXPORT_COLUMNS = ['word', 'translation', 'language', 'context', 'proficiency', 'created_at', 'last_reviewed']
+IMPORT_CHUNK_SIZE = 1000
+WORD_MAX_LENGTH = 100  # Vocabulary.word / translation column size
+LANGUAGES = {language.lower(): language for language in TARGET_LANGUAGES}
+
+
+class ImportReport(NamedTuple):
+    imported: int
+    duplicates: int
+    invalid: int
+
+
+class ImportFailed(Exception):
+    """The file could not be read to the end; ``report`` counts the rows committed before the error"""
+
+    def __init__(self, error, report):
+        super().__init__(str(error))
+        self.report = report
+
+
+def format_for_filename(filename):
+    """Guess the format from a file name (.csv, .jsonl/.ndjson, or Anki's .txt/.tsv export)"""
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    if name.endswith(('.txt', '.tsv')):
+        return 'anki'
+    return None
+
+
+def read_rows(stream, fmt):
+    """Yield word dicts from a text stream one line at a time.
+
+    CSV needs a header with at least ``word`` and ``translation`` (optional
+    ``context``, ``proficiency``, ``language``; the language must be one users
+    can study). JSONL has one such object per
+    line. Anki TSV is ``front<TAB>back[<TAB>context]`` without a header;
+    ``#key:value`` header lines from Anki's exporter are skipped.
+    """
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+    elif fmt == 'jsonl':
+        for line in stream:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield {}
+    elif fmt == 'anki':
+        for fields in csv.reader(stream, delimiter='\t'):
+            if not fields or fields[0].startswith('#'):
+                continue
+            yield {'word': fields[0], 'translation': fields[1] if len(fields) > 1 else '',
+                   'context': fields[2] if len(fields) > 2 else None}
+    else:
+        raise ValueError(f'Unknown format: {fmt}')
+
+
+def clean_row(row, default_language):
+    """Normalize an imported row the way the add-word form does, or None if it is unusable.
+
+    Rows in a language users cannot study are unusable: their words could never be viewed.
+    """
+    if not isinstance(row, dict):
+        return None
+    word = str(row.get('word') or '').strip().lower()
+    translation = str(row.get('translation') or '').strip()
+    if not word or not translation or len(word) > WORD_MAX_LENGTH or len(translation) > WORD_MAX_LENGTH:
+        return None
+    try:
+        proficiency = min(5.0, max(0.0, float(row.get('proficiency') or 0)))
+    except (TypeError, ValueError):
+        return None
+    language = str(row.get('language') or '').strip()
+    language = LANGUAGES.get(language.lower()) if language else default_language
+    if language is None:
+        return None
+    return {
+        'word': word,
+        'translation': translation,
+        'context': (str(row['context']).strip() or None) if row.get('context') else None,
+        'proficiency': proficiency,
+        'language': language,
+    }
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def import_vocabulary(user_id, rows, default_language, chunk_size=IMPORT_CHUNK_SIZE):
+    """Insert new words from ``rows`` in bounded-memory chunks.
+
+    Rows without a ``language`` go to ``default_language``. Each chunk is
+    deduplicated by (language, word) against itself, earlier chunks and the
+    user's existing words (one ``word IN (...)`` query per language on the
+    (user_id, language, word) index), then written with a single executemany
+    INSERT and committed, so a 20k-word file is ~20 transactions instead of
+    20k. Returns an ImportReport. If the file turns out to be unreadable part
+    way through, ImportFailed is raised with a report of the rows handled so
+    far; words from earlier chunks stay imported.
+    """
+    imported = duplicates = invalid = 0
+    seen = set()
+    chunks = _chunks(rows, chunk_size)
+    while True:
+        try:
+            chunk = next(chunks, None)
+        except (UnicodeDecodeError, csv.Error) as e:
+            db.session.rollback()
+            raise ImportFailed(e, ImportReport(imported, duplicates, invalid)) from e
+        if chunk is None:
+            break
+        cleaned = []
+        for row in chunk:
+            row = clean_row(row, default_language)
+            if row is None:
+                invalid += 1
+            elif (row['language'], row['word']) in seen:
+                duplicates += 1
+            else:
+                seen.add((row['language'], row['word']))
+                cleaned.append(row)
+        if not cleaned:
+            continue
+
+        by_language = defaultdict(list)
+        for row in cleaned:
+            by_language[row['language']].append(row['word'])
+        existing = set()
+        for language, words in by_language.items():
+            existing.update((language, word) for (word,) in db.session.query(Vocabulary.word).filter(
+                Vocabulary.user_id == user_id, Vocabulary.language == language, Vocabulary.word.in_(words)))
+        new_rows = [dict(row, user_id=user_id) for row in cleaned if (row['language'], row['word']) not in existing]
+        duplicates += len(cleaned) - len(new_rows)
+        if new_rows:
+            record_words_added(user_id, [(row['language'], row['proficiency']) for row in new_rows])
+            db.session.execute(insert(Vocabulary), new_rows)
+        db.session.commit()
+        imported += len(new_rows)
+    return ImportReport(imported, duplicates, invalid)
+
+
+def _export_records(user_id, chunk_size):
+    last_id = 0
+    while True:
+        rows = db.session.query(Vocabulary.id, *(getattr(Vocabulary, column) for column in EXPORT_COLUMNS)).filter(
+            Vocabulary.user_id == user_id, Vocabulary.id > last_id).order_by(Vocabulary.id).limit(chunk_size).all()
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1].id
+
+
+def export_vocabulary(user_id, fmt, chunk_size=IMPORT_CHUNK_SIZE):
+    """Yield the user's vocabulary as text in ``fmt``, reading it in primary-key chunks"""
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown format: {fmt}')
+    buffer = io.StringIO()
+    writer = None
+    if fmt == 'csv':
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+    elif fmt == 'anki':
+        writer = csv.writer(buffer, delimiter='\t', lineterminator='\n')
+        buffer.write('#separator:tab\n#html:false\n')
+
+    for count, record in enumerate(_export_records(user_id, chunk_size), 1):
+        values = {column: getattr(record, column) for column in EXPORT_COLUMNS}
+        for column in ('created_at', 'last_reviewed'):
+            values[column] = values[column].isoformat() if values[column] else None
+        if fmt == 'csv':
+            writer.writerow([values[column] for column in EXPORT_COLUMNS])
+        elif fmt == 'jsonl':
+            buffer.write(json.dumps(values, ensure_ascii=False) + '\n')
+        else:
+            writer.writerow([values['word'], values['translation'], values['context'] or ''])
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
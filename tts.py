@@ -0,0 +1,189 @@
+import hashlib
+import io
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Language names used on User/Vocabulary rows mapped to TTS language codes
+LANGUAGE_CODES = {
+    'Spanish': 'es',
+    'French': 'fr',
+    'German': 'de',
+    'Italian': 'it',
+    'Japanese': 'ja',
+    'Korean': 'ko',
+    'Chinese': 'zh-cn'
+}
+DEFAULT_LANG_CODE = 'es'
+
+
+def lang_code_for(language):
+    return LANGUAGE_CODES.get(language, DEFAULT_LANG_CODE)
+
+
+class TTSBackend:
+    """Base class for speech synthesizers.
+
+    Subclasses implement ``synthesize(text, lang_code, slow)`` and return the
+    encoded audio bytes. ``max_concurrency`` bounds how many syntheses the
+    dispatcher runs at once and ``timeout`` is how long a caller waits for one.
+    """
+    name = None
+    mimetype = 'audio/mpeg'
+    suffix = '.mp3'
+
+    def __init__(self, timeout=10.0, max_concurrency=4):
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+
+    def synthesize(self, text, lang_code, slow=False):
+        raise NotImplementedError
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS (network)"""
+    name = 'gtts'
+
+    def synthesize(self, text, lang_code, slow=False):
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang_code, slow=slow, timeout=self.timeout).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class LocalBackend(TTSBackend):
+    """Offline synthesis with the espeak-ng (or espeak) command line engine"""
+    name = 'local'
+    mimetype = 'audio/wav'
+    suffix = '.wav'
+
+    # espeak voices differ slightly from gTTS language codes
+    VOICES = {'zh-cn': 'cmn'}
+
+    def __init__(self, timeout=10.0, max_concurrency=4):
+        super().__init__(timeout, max_concurrency)
+        self.executable = shutil.which('espeak-ng') or shutil.which('espeak')
+
+    def synthesize(self, text, lang_code, slow=False):
+        if not self.executable:
+            raise RuntimeError('espeak-ng is not installed')
+        command = [self.executable, '-v', self.VOICES.get(lang_code, lang_code), '--stdout']
+        if slow:
+            command += ['-s', '110']
+        result = subprocess.run(command + [text], capture_output=True, check=True, timeout=self.timeout)
+        return result.stdout
+
+
+class StubBackend(TTSBackend):
+    """Deterministic offline stand-in for tests and benchmarks"""
+    name = 'stub'
+
+    def __init__(self, timeout=10.0, max_concurrency=4, latency=0.0):
+        super().__init__(timeout, max_concurrency)
+        self.latency = latency
+
+    def synthesize(self, text, lang_code, slow=False):
+        if self.latency:
+            time.sleep(self.latency)
+        digest = hashlib.sha256(f'{lang_code}:{text}:{int(slow)}'.encode('utf-8')).digest()
+        return b'ID3' + digest * 64
+
+
+BACKENDS = {
+    'gtts': GTTSBackend,
+    'local': LocalBackend,
+    'stub': StubBackend,
+}
+
+
+def create_backend(name, **options):
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f'Unknown TTS backend "{name}" (choose from {", ".join(BACKENDS)})')
+    return backend_class(**options)
+
+
+class TTSDispatcher:
+    """Runs syntheses on a bounded thread pool and coalesces duplicate requests.
+
+    Concurrent requests for the same (lang_code, text, slow) share a single
+    in-flight future ("single-flight"), so a burst of users asking for the same
+    word results in one upstream call. Results are stored in ``cache`` and the
+    futures resolve to the cached file path.
+    """
+
+    def __init__(self, backend, cache, on_synthesis=None):
+        self.backend = backend
+        self.cache = cache
+        # Called with the seconds each backend synthesis took (e.g. to feed a histogram)
+        self.on_synthesis = on_synthesis
+        self.synthesized = 0
+        self.coalesced = 0
+        self.synthesis_seconds = 0.0
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, backend.max_concurrency),
+                                            thread_name_prefix=f'tts-{backend.name}')
+
+    def _synthesize(self, key, text, lang_code, slow):
+        # Another flight may have finished between the caller's miss and now
+        path = self.cache.path_for_key(key)
+        if self.cache.contains(lang_code, text, slow):
+            return path
+        started = time.perf_counter()
+        data = self.backend.synthesize(text, lang_code, slow)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.synthesized += 1
+            self.synthesis_seconds += elapsed
+        if self.on_synthesis:
+            self.on_synthesis(elapsed)
+        return self.cache.put(lang_code, text, data, slow)
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def submit(self, text, lang_code, slow=False):
+        """Return a future for the audio path, joining an in-flight synthesis if there is one"""
+        key = self.cache.key(lang_code, text, slow)
+        with self._lock:
+            future = self._inflight.get(key)
+            # A finished future may not have been forgotten yet (callbacks run after waiters wake);
+            # never hand out a failed one, so a retry right after an error synthesizes again
+            if future is not None and not future.done():
+                self.coalesced += 1
+                return future
+            future = self._executor.submit(self._synthesize, key, text, lang_code, slow)
+            self._inflight[key] = future
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def get_audio(self, text, lang_code, slow=False):
+        """Return the cached audio path, synthesizing (at most once) on a miss.
+
+        Raises ``concurrent.futures.TimeoutError`` if the backend takes longer
+        than its timeout.
+        """
+        path = self.cache.get(lang_code, text, slow)
+        if path:
+            return path
+        return self.submit(text, lang_code, slow).result(timeout=self.backend.timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.backend.name,
+                'synthesized': self.synthesized,
+                'coalesced': self.coalesced,
+                'synthesis_seconds': round(self.synthesis_seconds, 3),
+                'in_flight': len(self._inflight),
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,95 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from audio_cache import normalize_text
+
+
+def collect_words(catalog, vocabulary_rows, lang_code_for):
+    """Deduplicate (language, word) pairs from the word catalog and user vocabularies.
+
+    ``vocabulary_rows`` is any iterable of (language, word) tuples, so callers can
+    stream them from the database. Returns a list of (lang_code, word).
+    """
+    seen = set()
+    items = []
+
+    def add(language, word):
+        lang_code = lang_code_for(language)
+        key = (lang_code, normalize_text(word))
+        if key[1] and key not in seen:
+            seen.add(key)
+            items.append((lang_code, word))
+
+    for language in catalog.languages():
+        for entry in catalog.words(language):
+            add(language, entry.word)
+    for language, word in vocabulary_rows:
+        add(language, word)
+    return items
+
+
+class WarmupReport:
+    def __init__(self, total):
+        self.total = total
+        self.skipped = 0
+        self.generated = 0
+        self.failed = 0
+        self.errors = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def done(self):
+        return self.skipped + self.generated + self.failed
+
+    @property
+    def throughput(self):
+        return self.generated / self.elapsed if self.elapsed else 0.0
+
+    def record(self, outcome, error=None):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            if error is not None:
+                self.errors.append(error)
+            self.elapsed = time.perf_counter() - self.started
+
+    def summary(self):
+        return (f'{self.done}/{self.total} words: {self.generated} generated, '
+                f'{self.skipped} already cached, {self.failed} failed '
+                f'in {self.elapsed:.1f}s ({self.throughput:.1f} words/s)')
+
+
+def warm_audio_cache(items, cache, synthesize, workers=4, progress=None, progress_every=50):
+    """Pre-generate audio for every (lang_code, word) not already in ``cache``.
+
+    Work is incremental: entries that already exist are skipped, and every write
+    is atomic, so an interrupted run can simply be started again.
+    """
+    report = WarmupReport(len(items))
+    pending = []
+    for lang_code, word in items:
+        if cache.contains(lang_code, word):
+            report.record('skipped')
+        else:
+            pending.append((lang_code, word))
+
+    def generate(lang_code, word):
+        cache.put(lang_code, word, synthesize(word, lang_code, False))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(generate, lang_code, word): (lang_code, word)
+                   for lang_code, word in pending}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                report.record('generated')
+            except Exception as e:
+                lang_code, word = futures[future]
+                report.record('failed', f'{lang_code}:{word}: {e}')
+            if progress and report.done % progress_every == 0:
+                progress(report)
+
+    report.elapsed = time.perf_counter() - report.started
+    return report